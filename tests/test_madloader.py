@@ -19,6 +19,45 @@ test_data_folder = pathlib.Path(
 def test_non_zero_index():
     lst = [1, 2, 3, 0, 0, 0]
     assert xtrack.mad_loader.non_zero_len(lst) == 3
+    assert xtrack.mad_loader.non_zero_len([0, 0]) == 0
+    assert xtrack.mad_loader.non_zero_len([]) == 0
+
+
+def test_trim_trailing_zeros():
+    assert xtrack.mad_loader.trim_trailing_zeros([1, 0, 2, 0, 0]) == [1, 0, 2]
+    assert xtrack.mad_loader.trim_trailing_zeros([5, 0]) == [5]
+    assert xtrack.mad_loader.trim_trailing_zeros([0, 0]) == []
+
+
+def test_get_value_ndarray():
+    arr = np.array([[1, 2], [3, 4]])
+    out = xtrack.mad_loader.get_value(arr)
+    assert out.dtype == float
+    assert np.all(out == arr)
+
+    arr_obj = np.array([[1, 2.5], [3, 0]], dtype=object)
+    out = xtrack.mad_loader.get_value(arr_obj)
+    assert out.shape == (2, 2)
+    assert np.all(out == np.array([[1, 2.5], [3, 0]]))
+
+
+def test_add_arrays_padded():
+    a = np.array([1., 2., 3.])
+    b = np.array([1., 1., 1., 4.])
+    c = xtrack.mad_loader.add_arrays_padded(a, b)
+    assert np.all(c == [2., 3., 4., 4.])
+    assert np.all(a == [1., 2., 3.])
+
+
+def test_add_errors_to_list():
+    knl = [1., 2., 0., 0.]
+    dkn = np.array([0.1, 0.2, 0.3])
+    out = xtrack.mad_loader.add_errors_to_list(knl, dkn, 5)
+    assert isinstance(out, np.ndarray)
+    xo.assert_allclose(out, [1.1, 2.2, 0.3, 0., 0.], atol=1e-16, rtol=0)
+
+    out = xtrack.mad_loader.add_errors_to_list(knl, dkn, 2)
+    xo.assert_allclose(out, [1.1, 2.2], atol=1e-16, rtol=0)
 
 
 def test_add_lists():
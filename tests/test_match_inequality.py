@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import xtrack as xt
+from xtrack.match import _transition_poly
+
+
+def _reference_transition(x):
+    x_cut = 1/16 + np.sqrt(33)/16
+    poly = lambda x: 3 * x**3 - 2 * x**4
+    if x < 0:
+        return 0
+    if x < x_cut:
+        return poly(x)
+    else:
+        return x - x_cut + poly(x_cut)
+
+
+def test_transition_poly():
+    x = np.linspace(-2, 3, 101)
+    expected = np.array([_reference_transition(xx) for xx in x])
+
+    for xx, ee in zip(x, expected):
+        out = _transition_poly(float(xx))
+        assert isinstance(out, float)
+        assert np.isclose(out, ee, rtol=0, atol=1e-15)
+
+
+def test_inequality_auxtarget_arrays():
+    res = np.array([-1., 0.5, 1., 2.])
+
+    gt = xt.GreaterThan(1.)
+    np.testing.assert_array_equal(gt.auxtarget(res), [-2., -0.5, 0., 0.])
+    assert gt.auxtarget(0.5) == -0.5
+    assert gt.auxtarget(3.) == 0
+
+    lt = xt.LessThan(1.)
+    np.testing.assert_array_equal(lt.auxtarget(res), [0., 0., 0., -1.])
+    assert lt.auxtarget(2.) == -1.
+    assert lt.auxtarget(0.) == 0
+
+    gt_smooth = xt.GreaterThan(1., mode='smooth', sigma=0.1, sigma_rel=None)
+    np.testing.assert_allclose(
+        gt_smooth.auxtarget(res),
+        [0.1 * _reference_transition((1. - rr) / 0.1) for rr in res],
+        rtol=1e-12, atol=1e-15)
+    assert np.isclose(gt_smooth.auxtarget(0.95),
+                      0.1 * _reference_transition(0.5), rtol=1e-12, atol=0)
+
+    lt_smooth = xt.LessThan(1., mode='smooth', sigma=0.1, sigma_rel=None)
+    lt_smooth.sigma = 0.2
+    assert np.isclose(lt_smooth.auxtarget(1.1),
+                      0.2 * _reference_transition(0.5), rtol=1e-12, atol=0)
+
+
+def test_inequality_smooth_rejects_non_positive_sigma():
+    for cls in [xt.GreaterThan, xt.LessThan]:
+        for sigma in [0., -0.1]:
+            with pytest.raises(ValueError):
+                cls(1., mode='smooth', sigma=sigma, sigma_rel=None)
+        tt = cls(1., mode='smooth', sigma=0.1, sigma_rel=None)
+        with pytest.raises(ValueError):
+            tt.sigma = 0
@@ -211,9 +211,50 @@ def test_match_chroma_knob(test_context):
     xo.assert_allclose(tw.dqy, 7.0, atol=1e-4)
 
 
+def test_match_skips_chromatic_properties_if_not_needed():
 
+    with open(path_line) as f:
+        dct = json.load(f)
 
-
-
-
-
+    line = xt.Line.from_dict(dct['line'])
+    line.particle_ref = xp.Particles.from_dict(dct['particle'])
+    line.build_tracker()
+
+    # Record the arguments of all twiss calls made through the line
+    twiss_kwargs = []
+    line_twiss = line.twiss
+    def recording_twiss(*args, **kwargs):
+        twiss_kwargs.append(kwargs)
+        return line_twiss(*args, **kwargs)
+    line.twiss = recording_twiss
+
+    # No chromatic target: off-momentum twiss skipped while solving
+    opt = line.match(method='4d',
+                     vary=[xt.Vary('kqtf.b1', step=1e-8),
+                           xt.Vary('kqtd.b1', step=1e-8)],
+                     targets=[xt.Target('qx', 62.315, tol=1e-4),
+                              xt.Target('qy', 60.325, tol=1e-4)])
+    assert any(kw.get('compute_chromatic_properties') is False
+               for kw in twiss_kwargs)
+
+    # The action is left untouched
+    action = opt.targets[0].action
+    assert action._solve_kwargs == {}
+    assert 'compute_chromatic_properties' not in action.kwargs
+    twiss_kwargs.clear()
+    tw = action.run()
+    assert 'compute_chromatic_properties' not in twiss_kwargs[-1]
+    assert 'ax_chrom' in tw._col_names
+    xo.assert_allclose(tw.qx, 62.315, atol=1e-4, rtol=0)
+    xo.assert_allclose(tw.qy, 60.325, atol=1e-4, rtol=0)
+
+    # Chromatic target: off-momentum twiss kept while solving
+    twiss_kwargs.clear()
+    line.match(method='4d',
+               vary=[xt.Vary('ksf.b1', step=1e-8),
+                     xt.Vary('ksd.b1', step=1e-8)],
+               targets=[xt.Target('dqx', 3.0, tol=1e-4),
+                        xt.Target('dqy', 3.0, tol=1e-4)])
+    assert len(twiss_kwargs) > 0
+    assert all('compute_chromatic_properties' not in kw
+               for kw in twiss_kwargs)
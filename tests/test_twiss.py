@@ -1905,3 +1905,41 @@ def test_part_from_full_periodic(test_context, collider_for_test_twiss_range):
             tw_part2[kk, 'ip2'],
             tw[kk, 'ip2'] - tw[kk, 0] +(tw[kk, '_end_point'] - tw[kk, 'ip8']),
             rtol=1e-12, atol=5e-7)
+
+
+def test_str_to_index_cache():
+    from xtrack.twiss import _str_to_index
+
+    line = xt.Line(elements=[xt.Drift(length=1.0) for _ in range(4)],
+                   element_names=['d0', 'd1', 'd2', 'd3'])
+    line.build_tracker()
+
+    assert _str_to_index(line, 'd2') == 2
+    assert _str_to_index(line, '_end_point') == 4
+    with pytest.raises(ValueError):
+        _str_to_index(line, 'missing')
+
+    # Map is rebuilt when the line changes
+    line.discard_tracker()
+    line.insert_element(name='m', element=xt.Marker(), index=0)
+    line.build_tracker()
+    assert _str_to_index(line, 'd2') == 3
+
+
+def test_extra_markers_sorted_insertion():
+    from xtrack.twiss import _build_auxiliary_tracker_with_extra_markers
+
+    line = xt.Line(elements=[xt.Drift(length=1.0), xt.Marker(),
+                             xt.Drift(length=2.0), xt.Marker()],
+                   element_names=['d0', 'm0', 'd1', 'm1'])
+    line.build_tracker()
+
+    at_s = [0.0, 0.5, 1.0, 1.0, 2.5, 3.0, 1.7, 0.25, 2.0, 2.9, 1.0]
+    names = {}
+    for algorithm in ['insert', 'sorted']:
+        auxtracker, _ = _build_auxiliary_tracker_with_extra_markers(
+            tracker=line.tracker, at_s=at_s, marker_prefix='mk',
+            algorithm=algorithm)
+        names[algorithm] = list(auxtracker.line.element_names)
+
+    assert names['sorted'] == names['insert']
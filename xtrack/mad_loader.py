@@ -27,12 +27,16 @@ Loader.add_<name>(mad_elem,line,buffer) to add a new element to line
 
 if the want to control how the xobject is created
 """
+import math
+from functools import lru_cache
+from operator import attrgetter
 from typing import List, Union
 
 import numpy as np
 
 import xobjects
 import xtrack
+import xdeps as xd
 from .general import _print
 from .progress_indicator import progress
 
@@ -52,8 +56,11 @@ def set_if_not_none(dct, key, val):
         dct[key] = val
 
 
+_RAD2DEG = 180. / np.pi
+
+
 def rad2deg(rad):
-    return rad * 180 / np.pi
+    return rad * _RAD2DEG
 
 
 def get_value(x):
@@ -62,9 +69,10 @@ def get_value(x):
     elif isinstance(x, list) or isinstance(x, tuple):
         return [get_value(xx) for xx in x]
     elif isinstance(x, np.ndarray):
-        arr = np.zeros_like(x, dtype=float)
-        for ii in np.ndindex(*x.shape):
-            arr[ii] = get_value(x[ii])
+        if x.dtype != object:
+            return np.asarray(x, dtype=float)
+        flat = [get_value(xx) for xx in x.ravel()]
+        return np.array(flat, dtype=float).reshape(x.shape)
     elif isinstance(x, dict):
         return {k: get_value(v) for k, v in x.items()}
     else:
@@ -82,8 +90,11 @@ def set_expr(target, key, xx):
             set_expr(out, ii, ex)
     elif isinstance(xx, np.ndarray):
         out = getattr(target, key)
-        for ii in np.ndindex(*xx.shape):
-            set_expr(out, ii, xx[ii])
+        for ii, ex in enumerate(xx.ravel()):
+            if ex is None:
+                continue
+            idx = tuple(int(jj) for jj in np.unravel_index(ii, xx.shape))
+            set_expr(out, idx, ex)
     elif isinstance(xx, dict):
         for kk, ex in xx.items():
             set_expr(target[key], kk, ex)
@@ -110,22 +121,43 @@ def add_lists(a, b, length):
     return out
 
 
+def add_errors_to_list(lst, errors, length):
+    """Add numeric errors to a list of strengths, padding or truncating the
+    result to `length`. Returns a float array if the strengths are numeric,
+    a list (see `add_lists`) if they contain expressions."""
+    if any(is_expr(x) for x in lst):
+        return add_lists(lst, errors, length)
+    out = np.zeros(length, dtype=float)
+    n_lst = min(len(lst), length)
+    n_err = min(len(errors), length)
+    out[:n_lst] += lst[:n_lst]
+    out[:n_err] += errors[:n_err]
+    return out
+
+
 def non_zero_len(lst):
-    for ii, x in enumerate(lst[::-1]):
-        if x:  # could be expression
-            return len(lst) - ii
+    for ii in range(len(lst) - 1, -1, -1):
+        x = lst[ii]
+        if isinstance(x, (int, float)):
+            if x != 0:
+                return ii + 1
+        elif x:  # could be expression
+            return ii + 1
     return 0
 
 
 def trim_trailing_zeros(lst):
-    for ii in range(len(lst) - 1, 0, -1):
+    for ii in range(len(lst) - 1, -1, -1):
         if lst[ii] != 0:
             return lst[: ii + 1]
     return []
 
 
+_is_ref = xd.refs.is_ref
+
+
 def is_expr(x):
-    return hasattr(x, "_get_value")
+    return _is_ref(x)
 
 
 def nonzero_or_expr(x):
@@ -135,6 +167,25 @@ def nonzero_or_expr(x):
         return x != 0
 
 
+def has_expr(x):
+    """True if `x` is an expression or a container holding expressions."""
+    if is_expr(x):
+        return True
+    elif isinstance(x, (list, tuple)):
+        return any(has_expr(xx) for xx in x)
+    elif isinstance(x, np.ndarray):
+        return x.dtype == object and any(has_expr(xx) for xx in x.ravel())
+    elif isinstance(x, dict):
+        return any(has_expr(xx) for xx in x.values())
+    return False
+
+
+def evals_to_zero(x):
+    """True if `x` is a plain zero, i.e. not an expression that could later
+    change value."""
+    return not is_expr(x) and x == 0
+
+
 def value_if_expr(x):
     if is_expr(x):
         return x._value
@@ -151,26 +202,74 @@ def eval_list(par, madeval):
         ]
 
 
-def generate_repeated_name(line, name):
+def generate_repeated_name(line, name, name_counts=None):
+    """Return `name`, or `name:<ii>` with the first free index if `name` is
+    already in the line. If a `name_counts` dict is given, the next index to
+    try for each name is stored in it, so that the search does not restart
+    from zero for names repeated many times."""
     if name in line.element_dict:
-        ii = 0
+        ii = 0 if name_counts is None else name_counts.get(name, 0)
         while f"{name}:{ii}" in line.element_dict:
             ii += 1
+        if name_counts is not None:
+            name_counts[name] = ii + 1
         return f"{name}:{ii}"
     else:
         return name
 
 
+def make_drift_halves(Builder, drift_class, name, length):
+    """Make the builders of the two drifts, each of half the element length,
+    placed around a thin element installed at the center of a thick one."""
+    half_length = length * 0.5
+    return (
+        Builder(f"drift_{name}..1", drift_class, length=half_length),
+        Builder(f"drift_{name}..2", drift_class, length=half_length),
+    )
+
+
+def add_arrays_padded(a, b):
+    """Sum of two 1D arrays, the shorter one being padded with zeros."""
+    out = np.zeros(max(len(a), len(b)), dtype=float)
+    out[:len(a)] += a
+    out[:len(b)] += b
+    return out
+
+
+def _octagon_vertices_from_quadrant(x1, y1, x2, y2):
+    """Vertices of an octagon symmetric in X and Y, from its two vertices in
+    the first quadrant."""
+    x_vertices = [x1, x2, -x2, -x1, -x1, -x2, x2, x1]
+    y_vertices = [y1, y2, y2, y1, -y1, -y2, -y2, -y1]
+    return x_vertices, y_vertices
+
+
+@lru_cache(maxsize=4096)
+def _octagon_vertices(a0, a1, a2, a3):
+    """Vertices of a MAD-X octagon aperture with numeric parameters."""
+    x_vertices, y_vertices = _octagon_vertices_from_quadrant(
+        a0, a0 * math.tan(a2), a1 / math.tan(a3), a1)
+    return tuple(x_vertices), tuple(y_vertices)
+
+
 class FieldErrors:
     def __init__(self, field_errors):
-        self.dkn = np.array(field_errors.dkn)
-        self.dks = np.array(field_errors.dks)
+        self.dkn = np.asarray(field_errors.dkn, dtype=float)
+        self.dks = np.asarray(field_errors.dks, dtype=float)
+
+    def merge(self, other):
+        self.dkn = add_arrays_padded(self.dkn, other.dkn)
+        self.dks = add_arrays_padded(self.dks, other.dks)
 
 
 class PhaseErrors:
     def __init__(self, phase_errors):
-        self.dpn = np.array(phase_errors.dpn)
-        self.dps = np.array(phase_errors.dps)
+        self.dpn = np.asarray(phase_errors.dpn, dtype=float)
+        self.dps = np.asarray(phase_errors.dps, dtype=float)
+
+
+# Element attributes describing a misalignment, only supported for translations
+_MISALIGNMENT_ATTRS = ('dphi', 'dtheta', 'dpsi', 'dx', 'dy', 'ds')
 
 
 class MadElem:
@@ -182,14 +281,15 @@ class MadElem:
         self.elem = elem
         self.sequence = sequence
         self.madeval = madeval
+        self._type = elem.base_type.name
         ### needed for merge multipoles
-        if hasattr(elem, "field_errors") and elem.field_errors is not None:
-            self.field_errors = FieldErrors(elem.field_errors)
+        field_errors = getattr(elem, "field_errors", None)
+        if field_errors is not None:
+            self.field_errors = FieldErrors(field_errors)
         else:
             self.field_errors = None
-        if elem.base_type.name != 'translation' and (
-                elem.dphi or elem.dtheta or elem.dpsi
-                or elem.dx or elem.dy or elem.ds):
+        if self._type != 'translation' and any(
+                getattr(elem, kk) for kk in _MISALIGNMENT_ATTRS):
             raise NotImplementedError
 
     # @property
@@ -199,14 +299,21 @@ class MadElem:
     #        return FieldErrors(elem.field_errors)
 
     def get_type_hierarchy(self, cpymad_elem=None):
-        if cpymad_elem is None:
+        use_cache = cpymad_elem is None
+        if use_cache:
+            cached = self.__dict__.get("_type_hierarchy")
+            if cached is not None:
+                return list(cached)
             cpymad_elem = self.elem
 
-        if cpymad_elem.name == cpymad_elem.parent.name:
-            return [cpymad_elem.name]
+        hierarchy = [cpymad_elem.name]
+        while cpymad_elem.name != cpymad_elem.parent.name:
+            cpymad_elem = cpymad_elem.parent
+            hierarchy.append(cpymad_elem.name)
 
-        parent_types = self.get_type_hierarchy(cpymad_elem.parent)
-        return [cpymad_elem.name] + parent_types
+        if use_cache:
+            self._type_hierarchy = tuple(hierarchy)
+        return hierarchy
 
     @property
     def phase_errors(self):
@@ -225,7 +332,7 @@ class MadElem:
 
     @property
     def type(self):
-        return self.elem.base_type.name
+        return self._type
 
     @property
     def slot_id(self):
@@ -255,23 +362,26 @@ class MadElem:
 
     def has_aperture(self):
         el = self.elem
-        has_aper = hasattr(el, "aperture") and (
-            el.aperture[0] != 0.0 or len(el.aperture) > 1
-        )
-        has_aper = has_aper or (hasattr(el, "aper_vx") and len(el.aper_vx) > 2)
-        return has_aper
+        aperture = getattr(el, "aperture", None)
+        if aperture is not None and (aperture[0] != 0.0 or len(aperture) > 1):
+            return True
+        aper_vx = getattr(el, "aper_vx", None)
+        return aper_vx is not None and len(aper_vx) > 2
 
     def is_empty_marker(self):
         return self.type == "marker" and not self.has_aperture()
 
     def same_aperture(self, other):
+        if self is other:
+            return True
+        # Cheapest comparisons first
         return (
-            self.aperture == other.aperture
-            and self.aper_offset == other.aper_offset
+            self.apertype == other.apertype
             and self.aper_tilt == other.aper_tilt
+            and self.aper_offset == other.aper_offset
+            and self.aperture == other.aperture
             and self.aper_vx == other.aper_vx
             and self.aper_vy == other.aper_vy
-            and self.apertype == other.apertype
         )
 
     def merge_multipole(self, other):
@@ -284,9 +394,7 @@ class MadElem:
             self.knl += other.knl
             self.ksl += other.ksl
             if self.field_errors is not None and other.field_errors is not None:
-                for ii in range(len(self.field_errors.dkn)):
-                    self.field_errors.dkn[ii] += other.field_errors.dkn[ii]
-                    self.field_errors.dks[ii] += other.field_errors.dks[ii]
+                self.field_errors.merge(other.field_errors)
             self.name = self.name + "_" + other.name
             return True
         else:
@@ -313,7 +421,7 @@ class ElementBuilder:
         else:
             super().__setattr__(k, v)
 
-    def add_to_line(self, line, buffer):
+    def add_to_line(self, line, buffer, name_counts=None):
         if self.type is xtrack.Drift:
             self.attrs.pop("rot_s_rad", None)
             self.attrs.pop("shift_x", None)
@@ -322,12 +430,12 @@ class ElementBuilder:
         xtel = self.type(**self.attrs, _buffer=buffer)
         if name_associated_aperture:
             xtel.name_associated_aperture = name_associated_aperture
-        name = generate_repeated_name(line, self.name)
+        name = generate_repeated_name(line, self.name, name_counts)
         line.append_element(xtel, name)
 
 
 class ElementBuilderWithExpr(ElementBuilder):
-    def add_to_line(self, line, buffer):
+    def add_to_line(self, line, buffer, name_counts=None):
 
         if self.type is xtrack.Drift:
             self.attrs.pop("rot_s_rad", None)
@@ -337,13 +445,17 @@ class ElementBuilderWithExpr(ElementBuilder):
         attr_values = {k: get_value(v) for k, v in self.attrs.items()}
         name_associated_aperture = attr_values.pop("name_associated_aperture", None)
         xtel = self.type(**attr_values, _buffer=buffer)
-        name = generate_repeated_name(line, self.name)
+        name = generate_repeated_name(line, self.name, name_counts)
         if name_associated_aperture:
             xtel.name_associated_aperture = name_associated_aperture
         line.append_element(xtel, name)
-        elref = line.element_refs[name]
-        for k, p in self.attrs.items():
-            set_expr(elref, k, p)
+        # Plain values are already set by the constructor, only the
+        # expressions need to be attached
+        expr_attrs = [(k, p) for k, p in self.attrs.items() if has_expr(p)]
+        if expr_attrs:
+            elref = line.element_refs[name]
+            for k, p in expr_attrs:
+                set_expr(elref, k, p)
         return xtel
 
 
@@ -380,7 +492,7 @@ class Aperture:
                 builder.rot_s_rad = self.aper_tilt
             return [builder]
         else:
-            conveter = getattr(self.loader, "convert_" + self.apertype, None)
+            _, conveter = self.loader._get_handlers(self.apertype)
             if conveter is None:
                 raise ValueError(f"Aperture type `{self.apertype}` not supported")
             out = conveter(self.mad_el)
@@ -416,9 +528,43 @@ class Alignment:
         self.classes = classes
         self.Builder = Builder
 
+
+# Fixed arguments of the multipoles modelling MAD-X kickers
+_THIN_KICKER_KWARGS = {"hxl": 0}
+
+# Attributes of a MAD-X matrix element, in order
+_MATRIX_KICK_NAMES = tuple(f"kick{ii + 1}" for ii in range(6))
+_MATRIX_RM_NAMES = tuple(
+    f"rm{ii + 1}{jj + 1}" for ii in range(6) for jj in range(6))
+_get_matrix_entries = attrgetter(*_MATRIX_KICK_NAMES, *_MATRIX_RM_NAMES)
+
+
+def _matrix_entries_to_array(entries, shape):
+    """Float array from a flat list of matrix entries, or an object array if
+    some of them are expressions."""
+    if not any(is_expr(vv) for vv in entries):
+        return np.array(entries, dtype=float).reshape(shape)
+    # Filled entry by entry, as numpy would try to unpack the expressions if
+    # given a list of them
+    out = np.zeros(shape, dtype=object)
+    for ii, vv in enumerate(entries):
+        out.flat[ii] = vv
+    return out
+
+
 class Dummy:
     type = "None"
 
+
+# Actions of MadLoader.iter_elements when two consecutive elements are merged
+_MERGE_DRIFTS = "merge_drifts"
+_MERGE_MULTIPOLES = "merge_multipoles"
+
+
+# Element type -> (adder name, converter name), for each MadLoader class
+_HANDLER_NAMES_BY_CLASS = {}
+
+
 def _default_factory():
     return 0.
 
@@ -433,11 +579,14 @@ class MadLoader:
 
         _var_values = line._var_management["data"]["var_values"]
         _var_values.default_factory = _default_factory
-        for name, par in mad.globals.cmdpar.items():
-            if replace_in_expr is not None:
+        global_pars = list(mad.globals.cmdpar.items())
+        if replace_in_expr is None:
+            _var_values.update((name, par.value) for name, par in global_pars)
+        else:
+            for name, par in global_pars:
                 for k, v in replace_in_expr.items():
                     name = name.replace(k, v)
-            _var_values[name] = par.value
+                _var_values[name] = par.value
         _ref_manager = line._var_management["manager"]
         _vref = line._var_management["vref"]
         _fref = line._var_management["fref"]
@@ -445,21 +594,23 @@ class MadLoader:
 
         madeval_no_repl = MadxEval(_vref, _fref, mad.elements).eval
 
+        # The same expression strings are evaluated many times (e.g. once per
+        # attribute access of each element), so the parsed result is cached
         if replace_in_expr is not None:
+            @lru_cache(maxsize=None)
             def madeval(expr):
                 for k, v in replace_in_expr.items():
                     expr = expr.replace(k, v)
                 return madeval_no_repl(expr)
         else:
-            madeval = madeval_no_repl
-
-        # Extract expressions from madx globals
-        for name, par in mad.globals.cmdpar.items():
-            ee = par.expr
-            if ee is not None:
-                if "table(" in ee:  # Cannot import expressions involving tables
-                    continue
-                _vref[name] = madeval(ee)
+            madeval = lru_cache(maxsize=None)(madeval_no_repl)
+
+        # Extract expressions from madx globals (cannot import expressions
+        # involving tables)
+        global_exprs = [(name, par.expr) for name, par in global_pars
+                        if par.expr is not None and "table(" not in par.expr]
+        for name, ee in global_exprs:
+            _vref[name] = madeval(ee)
         return madeval
 
     def __init__(
@@ -529,40 +680,49 @@ class MadLoader:
 
         self.allow_thick = allow_thick
         self.bv = 1
+        self._name_counts = {}
+        self._handlers = {}
 
     def iter_elements(self, madeval=None):
         """Yield element data for each known element"""
-        if len(self.sequence.expanded_elements)==0:
-            raise ValueError(f"{self.sequence} has no elements, please do {self.sequence}.use()")
+        sequence = self.sequence
+        expanded_elements = sequence.expanded_elements
+        if len(expanded_elements)==0:
+            raise ValueError(f"{sequence} has no elements, please do {sequence}.use()")
         last_element = Dummy
         if self.bv == -1:
-            expanded_elements = list(self.sequence.expanded_elements)[::-1]
-        elif self.bv == 1:
-            expanded_elements = self.sequence.expanded_elements
-        else:
+            expanded_elements = list(expanded_elements)[::-1]
+        elif self.bv != 1:
             raise ValueError(f"bv should be 1 or -1, not {self.bv}")
+
+        # Local aliases for the per-element loop
+        skip_markers = self.skip_markers
+        ignore_madtypes = set(self.ignore_madtypes)
+        name_prefix = self.name_prefix
+
+        # Merge action for each enabled (previous type, current type) pair
+        merge_actions = {}
+        if self.merge_drifts:
+            merge_actions[("drift", "drift")] = _MERGE_DRIFTS
+        if self.merge_multipoles:
+            merge_actions[("multipole", "multipole")] = _MERGE_MULTIPOLES
+
         for el in expanded_elements:
-            madelem = MadElem(el.name, el, self.sequence, madeval,
-                              name_prefix=self.name_prefix)
-            if self.skip_markers and madelem.is_empty_marker():
-                pass
-            elif (
-                self.merge_drifts
-                and last_element.type == "drift"
-                and madelem.type == "drift"
-            ):
+            madelem = MadElem(el.name, el, sequence, madeval,
+                              name_prefix=name_prefix)
+            if skip_markers and madelem.is_empty_marker():
+                continue
+
+            action = merge_actions.get((last_element.type, madelem.type))
+            if action is _MERGE_DRIFTS:
                 last_element.l += el.l
-            elif (
-                self.merge_multipoles
-                and last_element.type == "multipole"
-                and madelem.type == "multipole"
-            ):
+            elif action is _MERGE_MULTIPOLES:
                 merged = last_element.merge_multipole(madelem)
                 if not merged:
                     yield last_element
                     last_element = madelem
-            elif madelem.type in self.ignore_madtypes:
-                pass
+            elif madelem.type in ignore_madtypes:
+                continue
             else:
                 if last_element is not Dummy:
                     yield last_element
@@ -579,6 +739,7 @@ class MadLoader:
 
         line = self.classes.Line()
         self.line = line
+        self._name_counts = {}
 
         if self.enable_expressions:
             madeval = MadLoader.init_line_expressions(line, mad,
@@ -601,15 +762,22 @@ class MadLoader:
         else:
             _prog = self.iter_elements(madeval=madeval)
 
+        self._init_handlers()
+
+        if self.expressions_for_element_types is not None:
+            expr_types = set(self.expressions_for_element_types)
+        else:
+            expr_types = None
+
         for ii, el in enumerate(_prog):
             # for each mad element create xtract elements in a buffer and add to a line
-            converter = getattr(self, "convert_" + el.type, None)
-            adder = getattr(self, "add_" + el.type, None)
-            if self.expressions_for_element_types is not None:
-               if el.type in self.expressions_for_element_types:
-                   self.Builder = ElementBuilderWithExpr
-                   el.madeval = madeval
-               else:
+            el_type = el.type
+            adder, converter = self._get_handlers(el_type)
+            if expr_types is not None:
+                if el_type in expr_types:
+                    self.Builder = ElementBuilderWithExpr
+                    el.madeval = madeval
+                else:
                     self.Builder = ElementBuilder
                     el.madeval = None
             if adder:
@@ -645,6 +813,48 @@ class MadLoader:
 
         return line
 
+    @classmethod
+    def _handler_names(cls):
+        """Names of the adder and converter methods (or None) of each element
+        type, collected once per loader class"""
+        names = _HANDLER_NAMES_BY_CLASS.get(cls)
+        if names is None:
+            converters = {}
+            adders = {}
+            for attr_name in dir(cls):
+                if attr_name.startswith("convert_"):
+                    converters[attr_name[len("convert_"):]] = attr_name
+                elif attr_name.startswith("add_"):
+                    adders[attr_name[len("add_"):]] = attr_name
+            names = {
+                el_type: (adders.get(el_type), converters.get(el_type))
+                for el_type in set(adders) | set(converters)
+            }
+            _HANDLER_NAMES_BY_CLASS[cls] = names
+        return names
+
+    def _init_handlers(self):
+        """Resolve the adders and converters once for all element types"""
+        self._handlers = {
+            el_type: (
+                getattr(self, add_name) if add_name else None,
+                getattr(self, convert_name) if convert_name else None,
+            )
+            for el_type, (add_name, convert_name)
+            in self._handler_names().items()
+        }
+
+    def _get_handlers(self, el_type):
+        """Return the adder and converter (or None) for an element type"""
+        handlers = self._handlers.get(el_type)
+        if handlers is None:
+            # Not found when the table was built, e.g. set on the instance
+            # afterwards: resolve by name once and remember the result
+            handlers = (getattr(self, "add_" + el_type, None),
+                        getattr(self, "convert_" + el_type, None))
+            self._handlers[el_type] = handlers
+        return handlers
+
     def add_elements(
         self,
         elements: List[Union[ElementBuilder]],
@@ -653,7 +863,7 @@ class MadLoader:
     ):
         out = {}  # tbc
         for el in elements:
-            xt_element = el.add_to_line(line, buffer)
+            xt_element = el.add_to_line(line, buffer, self._name_counts)
             out[el.name] = xt_element  # tbc
         return out  # tbc
 
@@ -662,7 +872,6 @@ class MadLoader:
         if issubclass(self.Builder, ElementBuilderWithExpr):
             return self.line._var_management['fref']
 
-        import math
         return math
 
     def _assert_element_is_thin(self, mad_el):
@@ -680,13 +889,6 @@ class MadLoader:
                     f'`allow_thick=True`?'
                 )
 
-    def _make_drift_slice(self, mad_el, weight, name_pattern):
-        return self.Builder(
-            name_pattern.format(mad_el.name),
-            self.classes.Drift,
-            length=mad_el.l * weight,
-        )
-
     def make_composite_element(
             self,
             xtrack_el,
@@ -732,21 +934,24 @@ class MadLoader:
         align.dx = 0
         align.dy = 0
 
+        if not aperture_seq:
+            # Nothing to prepend, the element list can be returned as is
+            return xtrack_el
+
         # Attach aperture to main element
-        if aperture_seq:
-            assert len(aperture_seq) <= 1, (
-                "Only one aperture per mad element is supported")
-            main_element=None
-            for ee in xtrack_el:
-                if ee.name== mad_el.name:
-                    main_element=ee
-                    break
-            assert main_element is not None
-            xtrack_el[0].name_associated_aperture = aperture_seq[0].name
+        assert len(aperture_seq) <= 1, (
+            "Only one aperture per mad element is supported")
+        main_element=None
+        for ee in xtrack_el:
+            if ee.name== mad_el.name:
+                main_element=ee
+                break
+        assert main_element is not None
+        xtrack_el[0].name_associated_aperture = aperture_seq[0].name
 
-        elem_list = aperture_seq + xtrack_el
+        xtrack_el[:0] = aperture_seq
 
-        return elem_list
+        return xtrack_el
 
     def convert_quadrupole(self, mad_el):
         if self.allow_thick:
@@ -787,34 +992,44 @@ class MadLoader:
 
         assert self.allow_thick, "Bends are not supported in thin mode."
 
-        l_curv = mad_el.l
-        h = mad_el.angle / l_curv
-
-        if mad_el.type == 'rbend' and self.sequence._madx.options.rbarc and value_if_expr(mad_el.angle):
-            R = 0.5 * mad_el.l / self.math.sin(0.5 * mad_el.angle) # l is on the straight line
-            l_curv = R * mad_el.angle
+        # Each attribute access goes through cpymad (and possibly expression
+        # evaluation), so read the ones used multiple times only once
+        bend_type = mad_el.type
+        length = mad_el.l
+        angle = mad_el.angle
+        hgap = mad_el.hgap
+        fint = mad_el.fint
+        fintx = mad_el.fintx
+
+        l_curv = length
+        h = angle / l_curv
+
+        if bend_type == 'rbend' and self.sequence._madx.options.rbarc and value_if_expr(angle):
+            R = 0.5 * length / self.math.sin(0.5 * angle) # l is on the straight line
+            l_curv = R * angle
             h = 1 / R
 
-        if not mad_el.k0:
+        k0 = mad_el.k0
+        if not k0:
             k0 = h
-        else:
-            k0 = mad_el.k0
 
         # Edge angles
-        if mad_el.type == 'sbend':
+        if bend_type == 'sbend':
             e1 = mad_el.e1
             e2 = mad_el.e2
-        elif mad_el.type == 'rbend':
-            e1 = mad_el.e1 + mad_el.angle / 2
-            e2 = mad_el.e2 + mad_el.angle / 2
+        elif bend_type == 'rbend':
+            e1 = mad_el.e1 + angle / 2
+            e2 = mad_el.e2 + angle / 2
         else:
             raise NotImplementedError(
-                f'Unknown bend type {mad_el.type}.'
+                f'Unknown bend type {bend_type}.'
             )
 
         if self.bv == -1:
             e1, e2 = e2, e1
 
+        edge_angle_fdown = (k0 - h) * l_curv / 2
+
         # Convert bend core
         num_multipole_kicks = 0
         cls = self.classes.Bend
@@ -828,13 +1043,12 @@ class MadLoader:
             length=l_curv,
             edge_entry_angle=e1,
             edge_exit_angle=e2,
-            edge_entry_angle_fdown=(k0 - h) * l_curv / 2,
-            edge_exit_angle_fdown=(k0 - h) * l_curv / 2,
-            edge_entry_fint=mad_el.fint,
-            edge_exit_fint=(
-                mad_el.fintx if value_if_expr(mad_el.fintx) >= 0 else mad_el.fint),
-            edge_entry_hgap=mad_el.hgap,
-            edge_exit_hgap=mad_el.hgap,
+            edge_entry_angle_fdown=edge_angle_fdown,
+            edge_exit_angle_fdown=edge_angle_fdown,
+            edge_entry_fint=fint,
+            edge_exit_fint=fintx if value_if_expr(fintx) >= 0 else fint,
+            edge_entry_hgap=hgap,
+            edge_exit_hgap=hgap,
             knl=[0, 0, mad_el.k2 * l_curv],
             num_multipole_kicks=num_multipole_kicks,
             **kwargs,
@@ -932,19 +1146,26 @@ class MadLoader:
         a1 = ee.aperture[1]  # half-height
         a2 = ee.aperture[2]  # angle between the lower point and the X axis
         a3 = ee.aperture[3]  # angle between the other point and the X axis
-        V1 = (a0, a0 * self.math.tan(a2))
-        V2 = (a1 / self.math.tan(a3), a1)
+        if any(is_expr(aa) for aa in (a0, a1, a2, a3)):
+            x_vertices, y_vertices = _octagon_vertices_from_quadrant(
+                a0, a0 * self.math.tan(a2), a1 / self.math.tan(a3), a1)
+        else:
+            # Machines typically have many identical octagons
+            x_vertices, y_vertices = _octagon_vertices(a0, a1, a2, a3)
+            x_vertices, y_vertices = list(x_vertices), list(y_vertices)
         el = self.Builder(
             ee.name + "_aper",
             self.classes.LimitPolygon,
-            x_vertices=[V1[0], V2[0], -V2[0], -V1[0], -V1[0], -V2[0], V2[0], V1[0]],
-            y_vertices=[V1[1], V2[1], V2[1], V1[1], -V1[1], -V2[1], -V2[1], -V1[1]],
+            x_vertices=x_vertices,
+            y_vertices=y_vertices,
         )
         return [el]
 
     def convert_polygon(self, ee):
-        x_vertices = ee.aper_vx[0::2]
-        y_vertices = ee.aper_vy[1::2]
+        # MAD-X stores the x and y coordinates of the vertices in two separate
+        # arrays (not interleaved); each access already returns a new list
+        x_vertices = ee.aper_vx
+        y_vertices = ee.aper_vy
         el = self.Builder(
             ee.name + "_aper",
             self.classes.LimitPolygon,
@@ -1001,8 +1222,8 @@ class MadLoader:
             dkn = mad_elem.field_errors.dkn
             dks = mad_elem.field_errors.dks
             lmax = max(lmax, non_zero_len(dkn), non_zero_len(dks))
-            knl = add_lists(knl, dkn, lmax)
-            ksl = add_lists(ksl, dks, lmax)
+            knl = add_errors_to_list(knl, dkn, lmax)
+            ksl = add_errors_to_list(ksl, dks, lmax)
         el = self.Builder(mad_elem.name, self.classes.Multipole, order=lmax - 1)
         el.knl = knl[:lmax]
         el.ksl = ksl[:lmax]
@@ -1022,32 +1243,36 @@ class MadLoader:
         el.length = mad_elem.lrad
         return self.make_composite_element([el], mad_elem)
 
-    def convert_kicker(self, mad_el): # bv done
-        hkick = [-mad_el.hkick] if mad_el.hkick else []
-        vkick = [self.bv * mad_el.vkick] if mad_el.vkick else []
+    def _convert_kicker_generic(self, mad_el, hkick, vkick):
+        """Convert a kicker-like element given its horizontal and vertical
+        kicks (as lists, empty if there is no kick in that plane)."""
+        length = mad_el.l
         thin_kicker = self.Builder(
             mad_el.name,
             self.classes.Multipole,
             knl=hkick,
             ksl=vkick,
-            length=(mad_el.l or mad_el.lrad),
-            hxl=0,
+            length=(length or mad_el.lrad),
+            **_THIN_KICKER_KWARGS,
         )
 
-        if value_if_expr(mad_el.l) != 0:
+        if value_if_expr(length) != 0:
             if not self.allow_thick:
                 self._assert_element_is_thin(mad_el)
 
-            sequence = [
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..1"),
-                thin_kicker,
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..2"),
-            ]
+            drift_entry, drift_exit = make_drift_halves(
+                self.Builder, self.classes.Drift, mad_el.name, length)
+            sequence = [drift_entry, thin_kicker, drift_exit]
         else:
             sequence = [thin_kicker]
 
         return self.make_composite_element(sequence, mad_el)
 
+    def convert_kicker(self, mad_el): # bv done
+        hkick = [-mad_el.hkick] if mad_el.hkick else []
+        vkick = [self.bv * mad_el.vkick] if mad_el.vkick else []
+        return self._convert_kicker_generic(mad_el, hkick, vkick)
+
     convert_tkicker = convert_kicker
 
     def convert_hkicker(self, mad_el): # bv done
@@ -1056,69 +1281,31 @@ class MadLoader:
                 "hkicker with hkick is not supported, please use kick instead")
 
         hkick = [-mad_el.kick] if mad_el.kick else []
-        vkick = []
-        thin_hkicker = self.Builder(
-            mad_el.name,
-            self.classes.Multipole,
-            knl=hkick,
-            ksl=vkick,
-            length=(mad_el.l or mad_el.lrad),
-            hxl=0,
-        )
-
-        if value_if_expr(mad_el.l) != 0:
-            if not self.allow_thick:
-                self._assert_element_is_thin(mad_el)
-
-            sequence = [
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..1"),
-                thin_hkicker,
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..2"),
-            ]
-        else:
-            sequence = [thin_hkicker]
-
-        return self.make_composite_element(sequence, mad_el)
+        return self._convert_kicker_generic(mad_el, hkick, [])
 
     def convert_vkicker(self, mad_el): # bv done
         if mad_el.vkick:
             raise ValueError(
                 "vkicker with vkick is not supported, please use kick instead")
 
-        hkick = []
         vkick = [self.bv * mad_el.kick] if mad_el.kick else []
-        thin_vkicker = self.Builder(
-            mad_el.name,
-            self.classes.Multipole,
-            knl=hkick,
-            ksl=vkick,
-            length=(mad_el.l or mad_el.lrad),
-            hxl=0,
-        )
-
-        if value_if_expr(mad_el.l) != 0:
-            if not self.allow_thick:
-                self._assert_element_is_thin(mad_el)
-
-            sequence = [
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..1"),
-                thin_vkicker,
-                self._make_drift_slice(mad_el, 0.5, "drift_{}..2"),
-            ]
-        else:
-            sequence = [thin_vkicker]
-
-        return self.make_composite_element(sequence, mad_el)
+        return self._convert_kicker_generic(mad_el, [], vkick)
 
     def convert_dipedge(self, mad_elem):
         if self.bv == -1:
             raise NotImplementedError("Dipole edges for bv=-1 are not yet supported.")
         # TODO LRAD
+        h = mad_elem.h
+        e1 = mad_elem.e1
+        if evals_to_zero(h) and evals_to_zero(e1):
+            # The edge has no effect, keep only a marker with the element name
+            el = self.Builder(mad_elem.name, self.classes.Marker)
+            return self.make_composite_element([el], mad_elem)
         el = self.Builder(
             mad_elem.name,
             self.classes.DipoleEdge,
-            h=mad_elem.h,
-            e1=mad_elem.e1,
+            h=h,
+            e1=e1,
             hgap=mad_elem.hgap,
             fint=mad_elem.fint,
         )
@@ -1126,15 +1313,19 @@ class MadLoader:
 
     def convert_rfcavity(self, ee): # bv done
         # TODO LRAD
-        if ee.freq == 0 and ee.harmon:
+        # The beam and the element attributes are fetched from MAD-X at each
+        # access, so they are read only once
+        beam = getattr(self.sequence, 'beam', None)
+        freq = ee.freq
+        harmon = ee.harmon
+        if freq == 0 and harmon:
             frequency = (
-                ee.harmon * self.sequence.beam.beta * clight / self.sequence.length
+                harmon * beam.beta * clight / self.sequence.length
             )
         else:
-            frequency = ee.freq * 1e6
-        if (hasattr(self.sequence, 'beam')
-                and self.sequence.beam.particle == 'ion'):
-            scale_voltage = 1./self.sequence.beam.charge
+            frequency = freq * 1e6
+        if beam is not None and beam.particle == 'ion':
+            scale_voltage = 1./beam.charge
         else:
             scale_voltage = 1.
         if self.bv == -1:
@@ -1151,12 +1342,11 @@ class MadLoader:
             lag=lag_deg,
         )
 
-        if value_if_expr(ee.l) != 0:
-            sequence = [
-                self._make_drift_slice(ee, 0.5, f"drift_{{}}..1"),
-                el,
-                self._make_drift_slice(ee, 0.5, f"drift_{{}}..2"),
-            ]
+        length = ee.l
+        if value_if_expr(length) != 0:
+            drift_entry, drift_exit = make_drift_halves(
+                self.Builder, self.classes.Drift, ee.name, length)
+            sequence = [drift_entry, el, drift_exit]
         else:
             sequence = [el]
 
@@ -1329,17 +1519,14 @@ class MadLoader:
         if self.bv == -1:
             raise NotImplementedError("Matrix for bv=-1 are not yet supported.")
         length = ee.l
-        m0 = np.zeros(6, dtype=object)
-        for m0_i in range(6):
-            att_name = f"kick{m0_i+1}"
-            if hasattr(ee, att_name):
-                m0[m0_i] = getattr(ee, att_name)
-        m1 = np.zeros((6, 6), dtype=object)
-        for m1_i in range(6):
-            for m1_j in range(6):
-                att_name = f"rm{m1_i+1}{m1_j+1}"
-                if hasattr(ee, att_name):
-                    m1[m1_i, m1_j] = getattr(ee, att_name)
+        try:
+            entries = _get_matrix_entries(ee)
+        except AttributeError:
+            # Some attributes are not defined for this element
+            entries = [getattr(ee, att_name, 0)
+                       for att_name in _MATRIX_KICK_NAMES + _MATRIX_RM_NAMES]
+        m0 = _matrix_entries_to_array(entries[:6], (6,))
+        m1 = _matrix_entries_to_array(entries[6:], (6, 6))
         el = self.Builder(
             ee.name, self.classes.FirstOrderTaylorMap, length=length, m0=m0, m1=m1
         )
@@ -1348,7 +1535,11 @@ class MadLoader:
     def convert_srotation(self, ee):
         if self.bv == -1:
             raise NotImplementedError("SRotation for bv=-1 are not yet supported.")
-        angle = ee.angle*180/np.pi
+        if evals_to_zero(ee.angle):
+            # No rotation, keep only a marker with the element name
+            el = self.Builder(ee.name, self.classes.Marker)
+            return self.make_composite_element([el], ee)
+        angle = rad2deg(ee.angle)
         el = self.Builder(
             ee.name, self.classes.SRotation, angle=angle
         )
@@ -1357,7 +1548,11 @@ class MadLoader:
     def convert_xrotation(self, ee):
         if self.bv == -1:
             raise NotImplementedError("XRotation for bv=-1 are not yet supported.")
-        angle = ee.angle*180/np.pi
+        if evals_to_zero(ee.angle):
+            # No rotation, keep only a marker with the element name
+            el = self.Builder(ee.name, self.classes.Marker)
+            return self.make_composite_element([el], ee)
+        angle = rad2deg(ee.angle)
         el = self.Builder(
             ee.name, self.classes.XRotation, angle=angle
         )
@@ -1366,7 +1561,11 @@ class MadLoader:
     def convert_yrotation(self, ee):
         if self.bv == -1:
             raise NotImplementedError("YRotation for bv=-1 are not yet supported.")
-        angle = ee.angle*180/np.pi
+        if evals_to_zero(ee.angle):
+            # No rotation, keep only a marker with the element name
+            el = self.Builder(ee.name, self.classes.Marker)
+            return self.make_composite_element([el], ee)
+        angle = rad2deg(ee.angle)
         el = self.Builder(
             ee.name, self.classes.YRotation, angle=angle
         )
@@ -1375,11 +1574,16 @@ class MadLoader:
     def convert_translation(self, ee):
         if self.bv == -1:
             raise NotImplementedError("Translation for bv=-1 are not yet supported.")
-        el_transverse = self.Builder(
-            ee.name, self.classes.XYShift, dx=ee.dx, dy=ee.dy
-        )
+        dx, dy = ee.dx, ee.dy
         if ee.ds:
             raise NotImplementedError # Need to implement ShiftS element
+        if evals_to_zero(dx) and evals_to_zero(dy):
+            # No shift, keep only a marker with the element name
+            el_transverse = self.Builder(ee.name, self.classes.Marker)
+        else:
+            el_transverse = self.Builder(
+                ee.name, self.classes.XYShift, dx=dx, dy=dy
+            )
         ee.dx = 0
         ee.dy = 0
         ee.ds = 0
@@ -1,4 +1,5 @@
 from collections.abc import Iterable
+import math
 from functools import partial
 
 import numpy as np
@@ -42,6 +43,13 @@ ALLOWED_TARGET_KWARGS= ['x', 'px', 'y', 'py', 'zeta', 'delta', 'pzata', 'ptau',
                         'gamx1', 'gamy1', 'gamx2', 'gamy2',
                         'eq_gemitt_x', 'eq_gemitt_y', 'eq_gemitt_zeta',
                         'eq_nemitt_x', 'eq_nemitt_y', 'eq_nemitt_zeta']
+_ALLOWED_TARGET_KWARGS_SET = frozenset(ALLOWED_TARGET_KWARGS)
+
+# Twiss quantities available only when the chromatic properties are computed
+_CHROMATIC_TWISS_QUANTITIES = frozenset([
+    'dqx', 'dqy', 'ddqx', 'ddqy', 'dmux', 'dmuy',
+    'ax_chrom', 'bx_chrom', 'ay_chrom', 'by_chrom', 'wx_chrom', 'wy_chrom',
+    'ddx', 'ddpx', 'ddy', 'ddpy'])
 
 Action = xd.Action
 
@@ -54,6 +62,7 @@ class ActionTwiss(xd.Action):
         self.kwargs = kwargs
         self.allow_twiss_failure = allow_twiss_failure
         self.compensate_radiation_energy_loss = compensate_radiation_energy_loss
+        self._solve_kwargs = {} # applied on top of kwargs while match_line solves
 
     def prepare(self):
         line = self.line
@@ -73,11 +82,12 @@ class ActionTwiss(xd.Action):
         if ismultiline:
 
             line_names = kwargs.get('lines', line.line_names)
-            none_list = [None] * len(line_names)
-            twinit_list = kwargs.get('init', none_list)
-            ele_start_list = kwargs.get('start', none_list)
-            ele_stop_list = kwargs.get('end', none_list)
-            ele_init_list = kwargs.get('init_at', none_list)
+            n_lines = len(line_names)
+            # Separate default lists, as they are modified in place below
+            twinit_list = list(kwargs.get('init', None) or [None] * n_lines)
+            ele_start_list = kwargs.get('start', None) or [None] * n_lines
+            ele_stop_list = kwargs.get('end', None) or [None] * n_lines
+            ele_init_list = kwargs.get('init_at', None) or [None] * n_lines
             line_list = [line[nn] for nn in line_names]
 
             assert isinstance(twinit_list, list)
@@ -87,6 +97,9 @@ class ActionTwiss(xd.Action):
             for ii, twinit in enumerate(twinit_list):
                 if isinstance(twinit, xt.MultiTwiss):
                     twinit_list[ii] = twinit[line_names[ii]]
+                elif isinstance(twinit, xt.TwissInit):
+                    # To avoid changing the one provided
+                    twinit_list[ii] = twinit.copy()
 
         else:
             twinit_list = [kwargs.get('init', None)]
@@ -95,12 +108,9 @@ class ActionTwiss(xd.Action):
             ele_init_list = [kwargs.get('init_at', None)]
             line_list = [line]
 
-            for ii, (twinit, start, end, init_at) in enumerate(
-                    zip(twinit_list, ele_start_list, ele_stop_list, ele_init_list)):
-                if isinstance(twinit, xt.TwissInit):
-                    twinit_list[ii] = twinit.copy()
-                elif isinstance(twinit, str):
-                    assert twinit == 'periodic'
+            # A provided TwissInit is copied by _complete_twiss_init below
+            if isinstance(twinit_list[0], str):
+                assert twinit_list[0] == 'periodic'
 
         # Handle init_at as xt.START or xt.END
         for ii, init_at in enumerate(ele_init_list):
@@ -133,47 +143,16 @@ class ActionTwiss(xd.Action):
                     init=twinit_list[0],
                     line=line,
                     reverse=None, # will be handled by the twiss
-                    x=kwargs.get('x', None),
-                    px=kwargs.get('px', None),
-                    y=kwargs.get('y', None),
-                    py=kwargs.get('py', None),
-                    zeta=kwargs.get('zeta', None),
-                    delta=kwargs.get('delta', None),
-                    alfx=kwargs.get('alfx', None),
-                    alfy=kwargs.get('alfy', None),
-                    betx=kwargs.get('betx', None),
-                    bety=kwargs.get('bety', None),
-                    bets=kwargs.get('bets', None),
-                    dx=kwargs.get('dx', None),
-                    dpx=kwargs.get('dpx', None),
-                    dy=kwargs.get('dy', None),
-                    dpy=kwargs.get('dpy', None),
-                    dzeta=kwargs.get('dzeta', None),
-                    mux=kwargs.get('mux', None),
-                    muy=kwargs.get('muy', None),
-                    muzeta=kwargs.get('muzeta', None),
-                    ax_chrom=kwargs.get('ax_chrom', None),
-                    bx_chrom=kwargs.get('bx_chrom', None),
-                    ay_chrom=kwargs.get('ay_chrom', None),
-                    by_chrom=kwargs.get('by_chrom', None),
-                    ddx=kwargs.get('ddx', None),
-                    ddy=kwargs.get('ddy', None),
-                    ddpx=kwargs.get('ddpx', None),
-                    ddpy=kwargs.get('ddpy', None),
-                    )
+                    **{kk: kwargs.get(kk, None)
+                       for kk in VARS_FOR_TWISS_INIT_GENERATION})
             for kk in VARS_FOR_TWISS_INIT_GENERATION + ['init_at']:
-                if kk in kwargs:
-                    kwargs.pop(kk)
+                kwargs.pop(kk, None)
             twinit_list[0] = init
 
         _keep_ini_particles_list = []
         for tt in twinit_list:
             _keep_ini_particles_list.append(isinstance(tt, xt.TwissInit))
 
-        for ii, tt in enumerate(twinit_list):
-            if isinstance(tt, xt.TwissInit):
-                twinit_list[ii] = tt.copy()
-
         for twini, ln, eest in zip(twinit_list, line_list, ele_start_list):
             if isinstance(twini, xt.TwissInit) and twini._needs_complete():
                 assert isinstance(eest, str)
@@ -205,10 +184,10 @@ class ActionTwiss(xd.Action):
                     ' for Multiline')
             self.line.compensate_radiation_energy_loss(verbose=False)
         if not self.allow_twiss_failure or not allow_failure:
-            out = self.line.twiss(**self.kwargs)
+            out = self.line.twiss(**{**self.kwargs, **self._solve_kwargs})
         else:
             try:
-                out = self.line.twiss(**self.kwargs)
+                out = self.line.twiss(**{**self.kwargs, **self._solve_kwargs})
             except Exception as ee:
                 if allow_failure:
                     return 'failed'
@@ -234,16 +213,17 @@ class ActionTwiss(xd.Action):
 #         return x + 2 / np.pi - 1
 
 def _poly(x):
-     return 3 * x**3 - 2 * x**4
+    return 3 * x * x * x - 2 * x * x * x * x
+
+_TRANSITION_X_CUT = 1/16 + math.sqrt(33)/16
+_TRANSITION_POLY_AT_X_CUT = _poly(_TRANSITION_X_CUT)
 
 def _transition_poly(x):
-        x_cut = 1/16 + np.sqrt(33)/16
-        if x < 0:
-            return 0
-        if x < x_cut:
-            return _poly(x)
-        else:
-            return x - x_cut + _poly(x_cut)
+    if x < 0:
+        return 0.
+    if x < _TRANSITION_X_CUT:
+        return _poly(x)
+    return x - _TRANSITION_X_CUT + _TRANSITION_POLY_AT_X_CUT
 
 class GreaterThan:
 
@@ -269,18 +249,33 @@ class GreaterThan:
         cost function.
         '''
         if self.mode == 'step':
-            if res < self.lower:
-                return res - self.lower
-            else:
-                return 0
+            res = np.asarray(res)
+            return np.where(res < self.lower, res - self.lower, 0.)[()]
         elif self.mode == 'smooth':
-            return self.sigma * self._transition((self.lower - res) / self.sigma)
+            xx = (self.lower - res) * self._inv_sigma
+            if np.ndim(xx) == 0:
+                return self.sigma * self._transition(xx)
+            # Array residuals (rare), transition applied element by element
+            return self.sigma * np.vectorize(self._transition, otypes=[float])(xx)
         elif self.mode == 'auxvar':
             raise NotImplementedError # experimental
             return res - self.lower - self.vary.container[self.vary.name]**2
         else:
             raise ValueError(f'Unknown mode {self.mode}')
 
+    @property
+    def sigma(self):
+        return self._sigma
+
+    @sigma.setter
+    def sigma(self, value):
+        if not value > 0:
+            raise ValueError(
+                f'`sigma` must be positive, got {value} (with `sigma_rel`, '
+                'provide `sigma` explicitly if the limit is zero)')
+        self._sigma = value
+        self._inv_sigma = 1. / value
+
     def __repr__(self):
         return f'GreaterThan({self.lower:4g})'
 
@@ -317,18 +312,33 @@ class LessThan:
 
     def auxtarget(self, res):
         if self.mode == 'step':
-            if res > self.upper:
-                return self.upper - res
-            else:
-                return 0
+            res = np.asarray(res)
+            return np.where(res > self.upper, self.upper - res, 0.)[()]
         elif self.mode == 'smooth':
-            return self.sigma * self._transition((res - self.upper) / self.sigma)
+            xx = (res - self.upper) * self._inv_sigma
+            if np.ndim(xx) == 0:
+                return self.sigma * self._transition(xx)
+            # Array residuals (rare), transition applied element by element
+            return self.sigma * np.vectorize(self._transition, otypes=[float])(xx)
         elif self.mode == 'auxvar':
             raise NotImplementedError # experimental
             return self.upper - res - self.vary.container[self.vary.name]**2
         else:
             raise ValueError(f'Unknown mode {self.mode}')
 
+    @property
+    def sigma(self):
+        return self._sigma
+
+    @sigma.setter
+    def sigma(self, value):
+        if not value > 0:
+            raise ValueError(
+                f'`sigma` must be positive, got {value} (with `sigma_rel`, '
+                'provide `sigma` explicitly if the limit is zero)')
+        self._sigma = value
+        self._inv_sigma = 1. / value
+
     def __repr__(self):
         return f'LessThan({self.upper:4g})'
 
@@ -346,6 +356,8 @@ class LessThan:
 
 class Target(xd.Target):
 
+    _cached_row = None
+
     def __init__(self, tar=None, value=None, at=None, tol=None, weight=None, scale=None,
                  line=None, action=None, tag='', optimize_log=False,
                  **kwargs):
@@ -394,7 +406,7 @@ class Target(xd.Target):
 
 
         for kk in kwargs:
-            assert kk in ALLOWED_TARGET_KWARGS, (
+            assert kk in _ALLOWED_TARGET_KWARGS_SET, (
                 f'Unknown keyword argument {kk}. '
                 f'Allowed keywords are {ALLOWED_TARGET_KWARGS}')
 
@@ -437,6 +449,8 @@ class Target(xd.Target):
             res = res[self.line]
         if callable(self.tar):
             out = self.tar(res)
+        elif isinstance(self.tar, tuple) and isinstance(res, xt.TwissTable):
+            out = self._eval_at_row(res)
         else:
             out = res[self.tar]
 
@@ -445,6 +459,23 @@ class Target(xd.Target):
 
         return out
 
+    def _eval_at_row(self, res):
+        # The row of `at` is looked up once and reused as long as the element
+        # name found in that row is unchanged
+        col, at = self.tar
+        row = self._cached_row
+        if row is not None:
+            names = res.name
+            if row < len(names) and names[row] == at:
+                return res[col][row]
+        out = res[self.tar]
+        self._cached_row = None
+        if isinstance(at, str):
+            rows = np.flatnonzero(res.name == at)
+            if len(rows) == 1:
+                self._cached_row = rows[0]
+        return out
+
     def transform(self, val):
         if hasattr(self.value, 'auxtarget'):
             return self.value.auxtarget(val)
@@ -514,19 +545,17 @@ class TargetSet(xd.TargetList):
         if tars is not None and not isinstance(tars, (list, tuple)):
             tars = [tars]
 
-        common_kwargs = locals().copy()
-        common_kwargs.pop('self')
-        common_kwargs.pop('kwargs')
-        common_kwargs.pop('tars')
-        common_kwargs.pop('value')
+        common_kwargs = dict(at=at, tol=tol, weight=weight, scale=scale,
+                             line=line, action=action, tag=tag,
+                             optimize_log=optimize_log)
 
         vnames = []
         vvalues = []
-        for kk in ALLOWED_TARGET_KWARGS:
-            if kk in kwargs:
-                vnames.append(kk)
-                vvalues.append(kwargs[kk])
-                kwargs.pop(kk)
+        if kwargs:
+            for kk in ALLOWED_TARGET_KWARGS: # keeps the canonical order
+                if kk in kwargs:
+                    vnames.append(kk)
+                    vvalues.append(kwargs.pop(kk))
 
         self.targets = []
         if tars is not None:
@@ -799,15 +828,28 @@ def match_line(line, vary, targets, solve=True, assert_within_tol=True,
 
     targets_flatten = []
     for tt in targets:
-        if isinstance(tt, xd.TargetList):
-            for tt1 in tt.targets:
-                targets_flatten.append(tt1.copy())
-        else:
+        sub_targets = getattr(tt, 'targets', None) # TargetList-like
+        if sub_targets is None:
             targets_flatten.append(tt.copy())
+        else:
+            targets_flatten.extend(tt1.copy() for tt1 in sub_targets)
 
     aux_vary = []
 
+    # Resolve defaults once for all targets
+    get_default_weight = XTRACK_DEFAULT_WEIGHTS.get
+    if default_tol is None:
+        tol_by_name = {}
+        fallback_tol = XTRACK_DEFAULT_TOL
+    elif isinstance(default_tol, dict):
+        tol_by_name = default_tol
+        fallback_tol = default_tol.get(None, XTRACK_DEFAULT_TOL)
+    else:
+        tol_by_name = {}
+        fallback_tol = default_tol
+
     action_twiss = None
+    resolved_locations = {} # START/END placeholders, per action and line
     for tt in targets_flatten:
 
         # Handle action
@@ -827,9 +869,13 @@ def match_line(line, vary, targets, solve=True, assert_within_tol=True,
             tt_name = tt.tar
             tt_at = None
         if tt_at is not None and isinstance(tt_at, _LOC):
-            tt_at = _at_from_placeholder(tt_at, line=tt.action.line,
+            loc_key = (id(tt.action), tt.line, tt_at.name)
+            if loc_key not in resolved_locations:
+                resolved_locations[loc_key] = _at_from_placeholder(
+                    tt_at, line=tt.action.line,
                     line_name=tt.line, start=tt.action.kwargs['start'],
                     end=tt.action.kwargs['end'])
+            tt_at = resolved_locations[loc_key]
             tt.tar = (tt_name, tt_at)
 
         # Handle value
@@ -842,15 +888,9 @@ def match_line(line, vary, targets, solve=True, assert_within_tol=True,
 
         # Handle weight
         if tt.weight is None:
-            tt.weight = XTRACK_DEFAULT_WEIGHTS.get(tt_name, 1.)
+            tt.weight = get_default_weight(tt_name, 1.)
         if tt.tol is None:
-            if default_tol is None:
-                tt.tol = XTRACK_DEFAULT_TOL
-            elif isinstance(default_tol, dict):
-                tt.tol = default_tol.get(tt_name,
-                                    default_tol.get(None, XTRACK_DEFAULT_TOL))
-            else:
-                tt.tol = default_tol
+            tt.tol = tol_by_name.get(tt_name, fallback_tol)
 
         # part of the `auxvar` experimental code
         # if isinstance(tt.value, (GreaterThan, LessThan)):
@@ -877,18 +917,30 @@ def match_line(line, vary, targets, solve=True, assert_within_tol=True,
                         check_limits=check_limits)
 
     if solve:
-        opt.solve()
+        # The two off-momentum twiss computations are skipped at each iteration
+        # if no target needs them. This is applied only while solving, the
+        # action keeps its own arguments for later use.
+        skip_chromatic = (action_twiss is not None
+            and 'compute_chromatic_properties' not in action_twiss.kwargs
+            and not _needs_chromatic_properties(targets_flatten, action_twiss))
+        if skip_chromatic:
+            action_twiss._solve_kwargs = {'compute_chromatic_properties': False}
+        try:
+            opt.solve()
+        finally:
+            if skip_chromatic:
+                action_twiss._solve_kwargs = {}
 
     return opt
 
 def _flatten_vary(vary):
     vary_flatten = []
     for vv in vary:
-        if isinstance(vv, xd.VaryList):
-            for vv1 in vv.vary_objects:
-                vary_flatten.append(vv1)
-        else:
+        sub_vary = getattr(vv, 'vary_objects', None) # VaryList-like
+        if sub_vary is None:
             vary_flatten.append(vv)
+        else:
+            vary_flatten.extend(sub_vary)
     return vary_flatten
 
 def _complete_vary_with_info_from_line(vary, line):
@@ -903,7 +955,8 @@ def closed_orbit_correction(line, line_co_ref, correction_config,
     for corr_name, corr in correction_config.items():
         _print('Correcting', corr_name)
         with xt.line._temp_knobs(line, corr['ref_with_knobs']):
-            tw_ref = line_co_ref.twiss(method='4d', zeta0=0, delta0=0)
+            tw_ref = line_co_ref.twiss(method='4d', zeta0=0, delta0=0,
+                                       only_orbit=True)
         vary = [xt.Vary(vv, step=1e-9) for vv in corr['vary']]
         targets = []
         for tt in corr['targets']:
@@ -929,7 +982,8 @@ def closed_orbit_correction(line, line_co_ref, correction_config,
                 zeta=tw_ref['zeta', corr['start']],
                 delta=tw_ref['delta', corr['start']],
             ),
-            start=corr['start'], end=corr['end'])
+            start=corr['start'], end=corr['end'],
+            only_orbit=True) # targets are on the orbit only
 
 def match_knob_line(line, knob_name, vary, targets, knob_value_start,
                     knob_value_end, run=True, **kwargs):
@@ -992,16 +1046,16 @@ class KnobOptimizer:
         return object.__dir__(self) + dir(self.opt)
 
     def generate_knob(self):
-        self.line.vars[self.knob_name] = self.knob_value_end
+        line_vars = self.line.vars
+        line_vars[self.knob_name] = self.knob_value_end
+        knob_ref = line_vars[self.knob_name]
+        delta_knob = self.knob_value_end - self.knob_value_start
         for vv in self.vary:
-            var_value = self.line.vars[vv.name]._value
-            self.line.vars[vv.name] = (
-                var_value / (self.knob_value_end - self.knob_value_start)
-                * (self.line.vars[self.knob_name]))
+            coeff = line_vars[vv.name]._value / delta_knob
+            expr = coeff * knob_ref
             if self.knob_value_start != 0:
-                self.line.vars[vv.name] -= (
-                    var_value / (self.knob_value_end - self.knob_value_start)
-                    * self.knob_value_start)
+                expr = expr - coeff * self.knob_value_start
+            line_vars[vv.name] = expr # single assignment per vary
 
         self.line.vars[self.knob_name] = self.knob_value_start
 
@@ -1019,23 +1073,27 @@ def _at_from_placeholder(tt_at, line, line_name, start, end):
     else:
         i_line = None
         this_line = line
-    if tt_at.name == 'START':
-        if i_line is not None:
-            tt_at = start[i_line]
-        else:
-            tt_at = start
-    elif tt_at.name == 'END':
-        if i_line is not None:
-            tt_at = end[i_line]
-        else:
-            tt_at = end
-    else:
+    locations = {'START': start, 'END': end}
+    if tt_at.name not in locations:
         raise ValueError(f'Unknown location {tt_at.name}')
+    tt_at = locations[tt_at.name]
+    if i_line is not None:
+        tt_at = tt_at[i_line]
     if not isinstance(tt_at, str):
         tt_at = this_line.element_names[tt_at]
 
     return tt_at
 
+def _needs_chromatic_properties(targets, action):
+    for tt in targets:
+        if tt.action is not action:
+            continue
+        tar = tt.tar[0] if isinstance(tt.tar, tuple) else tt.tar
+        # Callables (e.g. TargetRelPhaseAdvance) may use any quantity
+        if not isinstance(tar, str) or tar in _CHROMATIC_TWISS_QUANTITIES:
+            return True
+    return False
+
 def opt_from_callable(function, x0, steps, tar, tols):
 
     '''Optimize a generic callable'''
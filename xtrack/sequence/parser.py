@@ -2,8 +2,10 @@ import json
 import math
 import operator
 import re
+import sys
 import traceback
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Optional
 
@@ -45,6 +47,17 @@ BUILTIN_CONSTANTS = {
     'prad': sc.value('classical electron radius') * (sc.m_e / sc.m_p),  # m
 }
 
+# Operators are passed from the grammar by their name in the `operator` module
+BINARY_OPERATORS = {
+    op_name.encode(): getattr(operator, op_name)
+    for op_name in ['add', 'sub', 'mul', 'truediv', 'mod', 'pow']
+}
+
+UNARY_OPERATORS = {
+    op_name.encode(): getattr(operator, op_name)
+    for op_name in ['neg', 'pos']
+}
+
 AVAILABLE_ELEMENT_CLASSES = {cls.__name__: cls for cls in xt_element_classes}
 
 try:
@@ -69,8 +82,20 @@ class InvalidExpression:
         pass
 
 
+@lru_cache(maxsize=65536)
+def _decode_name(name: bytes) -> str:
+    """Decode an identifier coming from the scanner. Names repeat a lot in
+    lattice files, so each distinct name is only decoded once. The result is
+    interned, so that dict lookups keyed by these names (elements, classes,
+    variables) mostly succeed on identity."""
+    return sys.intern(name.decode())
+
+
 @cy.cfunc
 def _ref_get_value(value_or_ref):
+    value_type = type(value_or_ref)
+    if value_type is float or value_type is int or value_type is str:
+        return value_or_ref  # the most common case, plain literals
     if isinstance(value_or_ref, list):
         return [getattr(elem, '_value', elem) for elem in value_or_ref]
     return getattr(value_or_ref, '_value', value_or_ref)
@@ -87,10 +112,20 @@ class ParseLogEntry:
         self.error = error
 
     def add_file_line(self, file_lines):
+        start, end = self.column - 1, self.end_column - 1
+        if self.line_no == self.end_line_no and 0 <= start <= end:
+            # Most errors span a single line, underline it in one go
+            line = file_lines[self.line_no - 1]
+            self.context = ''.join([
+                line[:start], fmt.UNDERLINE, line[start:end],
+                fmt.NO_UNDERLINE, line[end:],
+            ])
+            return
+
         relevant_lines = file_lines[self.line_no - 1:self.end_line_no]
 
         def _insert(string, where, what):
-            return string[:where] + what + string[where:]
+            return ''.join([string[:where], what, string[where:]])
 
         relevant_lines[-1] = _insert(relevant_lines[-1], self.end_column - 1, fmt.NO_UNDERLINE)
         relevant_lines[0] = _insert(relevant_lines[0], self.column - 1, fmt.UNDERLINE)
@@ -136,17 +171,31 @@ class ParseError(Exception):
         super().__init__(message)
 
 
+class CaughtExceptionReason:
+    """The reason of a parse log entry for an exception caught in a callback.
+
+    Formatting the traceback is expensive, and only the first few entries of
+    the log are ever displayed (see `ParseError.LIMIT`), so this is deferred
+    until the reason is converted to a string."""
+    def __init__(self, exception, action):
+        self.exception = exception
+        self.action = action
+
+    def __str__(self):
+        caught_exc_string = '\n'.join(traceback.format_exception(self.exception))
+        caught_exc_string = fmt.indent_string(caught_exc_string, indent='    > ')
+
+        return (
+            f"While {self.action} the following error occurred:\n\n"
+            f"{caught_exc_string}"
+        )
+
+
 @cy.cfunc
 def register_error(scanner: xld.yyscan_t, exception, action, add_context=True, location=None):
     parser = parser_from_scanner(scanner)
-    caught_exc_string = '\n'.join(traceback.format_exception(exception))
-    caught_exc_string = fmt.indent_string(caught_exc_string, indent='    > ')
-
-    full_error_string = (
-        f"While {action} the following error occurred:\n\n"
-        f"{caught_exc_string}"
-    )
-    parser.handle_error(full_error_string, add_context=add_context, location=location)
+    reason = CaughtExceptionReason(exception, action)
+    parser.handle_error(reason, add_context=add_context, location=location)
 
 
 @cy.cclass
@@ -168,9 +217,9 @@ class LineTemplate:
         self.location = location
 
     def add_element(self, name, parent, args):
-        self._add_element(name, parent, args)
+        element = self._add_element(name, parent, args)
 
-        parent_name = getattr(self.element_dict[name], 'parent_name', None)
+        parent_name = getattr(element, 'parent_name', None)
         if parent_name and parent_name not in self.element_dict:
             self._add_element(
                 parent_name,
@@ -186,12 +235,17 @@ class LineTemplate:
         # need to update the element references in the parser with ours.
         parser.elements[self.name] = self.element_dict
 
-    def _add_element(self, name, parent, args):
-        if not args and parent not in AVAILABLE_ELEMENT_CLASSES:  # simply insert a replica
-            self.element_dict[name] = xt.Replica(parent_name=parent)
-            return
-
-        if parent not in AVAILABLE_ELEMENT_CLASSES:
+    @cy.ccall
+    @cy.locals(element_ref=object, list_ref=object, k=str, kwargs=dict,
+               ref_args=list)
+    def _add_element(self, name: str, parent: str, args):
+        element_cls = AVAILABLE_ELEMENT_CLASSES.get(parent)
+
+        if element_cls is None:
+            if not args:  # simply insert a replica
+                element = xt.Replica(parent_name=parent)
+                self.element_dict[name] = element
+                return element
             if parent in self.parser.global_elements:
                 raise SyntaxError(
                     f'Cloning elements while overriding parameters is not yet '
@@ -199,21 +253,35 @@ class LineTemplate:
                 )
             raise SyntaxError(f'Unknown element class `{parent}`.')
 
-        element_cls = AVAILABLE_ELEMENT_CLASSES[parent]
-        kwargs = {k: _ref_get_value(v) for k, v in args}
+        is_ref = xd.refs.is_ref
+        kwargs = {}
+        ref_args = []  # arguments that need to be wired as expressions
+        for k, v in args:
+            kwargs[k] = _ref_get_value(v)
+            if isinstance(v, list):
+                # Most lists (e.g. knl, ksl) are purely numeric
+                for le in v:
+                    if is_ref(le):
+                        ref_args.append((k, v))
+                        break
+            elif is_ref(v):
+                ref_args.append((k, v))
+
         element = element_cls.from_dict(kwargs, _context=self.parser._context)
         self.element_dict[name] = element  # this enables the leak somehow
         element_ref = self.parser.element_refs[self.name][name]
 
-        for k, v in args:
+        for k, v in ref_args:
             if isinstance(v, list):
                 list_ref = getattr(element_ref, k)
                 for i, le in enumerate(v):
-                    if xd.refs.is_ref(le):
+                    if is_ref(le):
                         list_ref[i] = le
-            elif xd.refs.is_ref(v):
+            else:
                 setattr(element_ref, k, v)
 
+        return element
+
     def add_command(self, command, args):
         argdict = {k: _ref_get_value(v) for k, v in args}
         if command == 'particle_ref':
@@ -367,13 +435,17 @@ class Parser:
             log_entry.context = text
         self.log.append(log_entry)
 
-    def get_identifier_ref(self, identifier, location):
+    @cy.ccall
+    def get_identifier_ref(self, identifier: str, location):
         try:
             if identifier in self.vars:
                 return self.var_refs[identifier]
 
-            if identifier in BUILTIN_CONSTANTS:
-                return py_float(self.scanner, BUILTIN_CONSTANTS[identifier])
+            # Constants are kept out of self.vars, so that they are inlined
+            # as numbers in expressions and do not end up in line.vars
+            constant = BUILTIN_CONSTANTS.get(identifier)
+            if constant is not None:
+                return py_float(self.scanner, constant)
 
             self.handle_error(
                 f'use of an undefined variable `{identifier}`',
@@ -383,7 +455,8 @@ class Parser:
         except Exception as e:
             register_error(self.scanner, e, 'getting an identifier reference')
 
-    def set_value(self, identifier, value, location):
+    @cy.ccall
+    def set_value(self, identifier: str, value, location):
         if identifier in self.vars:
             self.handle_warning(
                 f'redefinition of the variable `{identifier}`',
@@ -392,7 +465,8 @@ class Parser:
             )
         self.var_refs[identifier] = value
 
-    def add_global_element(self, name, parent, args):
+    @cy.ccall
+    def add_global_element(self, name: str, parent: str, args):
         self.global_elements[name] = (parent, args)
 
     def open_line(self, line_template):
@@ -585,10 +659,11 @@ def py_integer(scanner, value):
 
 @cy.exceptval(check=False)
 def py_numeric(scanner, value):
+    if not KEEP_LITERAL_EXPRESSIONS:
+        return value  # cannot fail, skip the error handling below
+
     try:
-        if KEEP_LITERAL_EXPRESSIONS:
-            return LiteralExpr(value)
-        return value
+        return LiteralExpr(value)
     except Exception as e:
         register_error(scanner, e, f'parsing a numeric value')
 
@@ -604,7 +679,7 @@ def py_string(scanner, value):
 @cy.exceptval(check=False)
 def py_unary_op(scanner, op_string, value):
     try:
-        function = getattr(operator, op_string.decode())
+        function = UNARY_OPERATORS[op_string]
         return function(value)
     except Exception as e:
         register_error(scanner, e, f'parsing a unary operation')
@@ -613,7 +688,7 @@ def py_unary_op(scanner, op_string, value):
 @cy.exceptval(check=False)
 def py_binary_op(scanner, op_string, left, right):
     try:
-        function = getattr(operator, op_string.decode())
+        function = BINARY_OPERATORS[op_string]
         return function(left, right)
     except Exception as e:
         register_error(scanner, e, f'parsing a binary operation')
@@ -622,13 +697,13 @@ def py_binary_op(scanner, op_string, left, right):
 @cy.exceptval(check=False)
 def py_call_func(scanner, func_name, value):
     try:
-        name = func_name.decode()
+        name = _decode_name(func_name)
         if name == 'const':
             return value._value if xd.refs.is_ref(value) else value
 
-        parser = parser_from_scanner(scanner)
+        parser: Parser = parser_from_scanner(scanner)
         if name not in parser.functions:
-            parser_from_scanner(scanner).handle_error(
+            parser.handle_error(
                 f'builtin function `{name}` is unknown',
             )
             return np.nan
@@ -640,7 +715,7 @@ def py_call_func(scanner, func_name, value):
 
 def py_assign(scanner, identifier, value):
     try:
-        return identifier.decode(), value
+        return _decode_name(identifier), value
     except Exception as e:
         register_error(scanner, e, f'parsing an assignment')
 
@@ -654,8 +729,8 @@ def py_arrow(scanner, source_name, field_name):
 
 def py_identifier_atom(scanner, name, location):
     try:
-        parser = parser_from_scanner(scanner)
-        return parser.get_identifier_ref(name.decode(), location)
+        parser: Parser = parser_from_scanner(scanner)
+        return parser.get_identifier_ref(_decode_name(name), location)
     except Exception as e:
         register_error(
             scanner, e, f'parsing an identifier',
@@ -666,7 +741,7 @@ def py_identifier_atom(scanner, name, location):
 def py_set_value(scanner, assignment, location):
     try:
         identifier, value = assignment
-        parser = parser_from_scanner(scanner)
+        parser: Parser = parser_from_scanner(scanner)
         if identifier in BUILTIN_CONSTANTS:
             parser.handle_warning(
                 f"variable `{identifier}` shadows a built-in constant",
@@ -684,7 +759,7 @@ def py_set_value(scanner, assignment, location):
 def py_reference(scanner, parent, field, location):
     try:
         parser = parser_from_scanner(scanner)
-        return parser.get_reference(parent, field.decode(), location)
+        return parser.get_reference(parent, _decode_name(field), location)
     except Exception as e:
         register_error(scanner, e, 'accessing a reference field')
 
@@ -716,12 +791,13 @@ def py_end_beamline(scanner, line_template):
 
 def py_clone(scanner, name, command) -> Optional[Tuple[str, str, dict]]:
     try:
-        if name.decode() in AVAILABLE_ELEMENT_CLASSES:
+        name_str = _decode_name(name)
+        if name_str in AVAILABLE_ELEMENT_CLASSES:
             parser = parser_from_scanner(scanner)
-            parser.handle_error(f'the name `{name.decode()}` shadows a built-in type.')
+            parser.handle_error(f'the name `{name_str}` shadows a built-in type.')
             return None
 
-        return name.decode(), command[0], command[1]
+        return name_str, command[0], command[1]
     except Exception as e:
         register_error(scanner, e, 'parsing a clone statement')
 
@@ -737,7 +813,7 @@ def py_clone_global(scanner, clone):
     try:
         if clone is None:  # A parsing error already occurred, recover
             return
-        parser = parser_from_scanner(scanner)
+        parser: Parser = parser_from_scanner(scanner)
         name, parent, args = clone
         parser.add_global_element(name, parent, args)
     except Exception as e:
@@ -747,7 +823,7 @@ def py_clone_global(scanner, clone):
 def py_command(scanner, name, arguments, location):
     try:
 
-        return name.decode(), arguments
+        return _decode_name(name), arguments
     except Exception as e:
         register_error(scanner, e, 'parsing a command statement',
                        add_context=True, location=location)
@@ -1,5 +1,3 @@
-import re
-
 UNDERLINE = '\033[4m'
 NO_UNDERLINE = '\033[24m'
 ERROR = '\033[91m'
@@ -16,4 +14,5 @@ def warning(string: str) -> str:
 
 
 def indent_string(string, indent='    '):
-    return re.sub('^', indent, string, flags=re.MULTILINE)
\ No newline at end of file
+    # Same as re.sub('^', indent, string, flags=re.MULTILINE)
+    return indent + string.replace('\n', '\n' + indent)
\ No newline at end of file
@@ -20,6 +20,11 @@ APER_ELEMS_REGEX = re.compile(r'(.*)_aper(_(tilt|offset)_(entry|exit))?')
 
 
 class ElementSlicingScheme(abc.ABC):
+    # Whether the weights depend on the length of the sliced element; if not,
+    # the sequence of weights is computed once and reused for all elements.
+    _weights_depend_on_length = True
+    _cached_weights = None
+
     def __init__(
             self,
             slicing_order: int,
@@ -61,6 +66,14 @@ class ElementSlicingScheme(abc.ABC):
         Iterator[Tuple[float, bool]]
             Iterator of weights and whether the weight is for a drift.
         """
+        if self._weights_depend_on_length:
+            return self._iter_weights(element_length)
+
+        if self._cached_weights is None:
+            self._cached_weights = tuple(self._iter_weights(None))
+        return iter(self._cached_weights)
+
+    def _iter_weights(self, element_length):
         for drift_weight, elem_weight in zip_longest(
                 self.drift_weights(element_length),
                 self.element_weights(element_length),
@@ -79,6 +92,8 @@ class ElementSlicingScheme(abc.ABC):
 
 
 class Uniform(ElementSlicingScheme):
+    _weights_depend_on_length = False
+
     def element_weights(self, element_length=None):
         if self.slicing_order == 0 and self.mode == 'thick':
             return [1.]
@@ -93,6 +108,8 @@ class Uniform(ElementSlicingScheme):
 
 
 class Teapot(ElementSlicingScheme):
+    _weights_depend_on_length = False
+
     def element_weights(self, element_length=None):
         if self.slicing_order == 0 and self.mode == 'thick':
             return [1.]
@@ -212,6 +229,36 @@ class Strategy:
         return f"{type(self).__name__}({formatted_params})"
 
 
+def _has_name_regex(strategy):
+    return strategy.regex and isinstance(strategy.match_name, re.Pattern)
+
+
+_BACKREFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def _fuse_strategy_regexes(strategies):
+    """Combine the name regexes of the strategies into a single alternation,
+    with a group `s<index>` per strategy. Returns None if no strategy has a
+    name regex, or if the patterns cannot be safely combined."""
+    alternatives = []
+    for ii, strategy in enumerate(strategies):
+        if not _has_name_regex(strategy):
+            continue
+        pattern = strategy.match_name
+        if (pattern.flags & ~re.UNICODE
+                or _BACKREFERENCE_REGEX.search(pattern.pattern)):
+            return None
+        alternatives.append(f'(?P<s{ii}>{pattern.pattern})')
+
+    if not alternatives:
+        return None
+
+    try:
+        return re.compile('|'.join(alternatives))
+    except re.error:
+        return None
+
+
 class Slicer:
     def __init__(self, line, slicing_strategies: List[Strategy]):
         """
@@ -230,6 +277,19 @@ class Slicer:
                                     ] + slicing_strategies
         self._has_expressions = line.vars is not None
 
+        # Strategies in the order in which they are tried, and a single regex
+        # telling which of the name-regex strategies is the first to match
+        self._strategies_by_priority = list(reversed(self._slicing_strategies))
+        self._fused_name_regex = _fuse_strategy_regexes(
+            self._strategies_by_priority)
+
+        # If no strategy looks at element names, the chosen scheme only
+        # depends on the element class and can be cached per class
+        if any(ss.match_name for ss in self._slicing_strategies):
+            self._scheme_by_class = None
+        else:
+            self._scheme_by_class = {}
+
     def slice_in_place(self, _edge_markers=True):
 
         self._line._frozen_check()
@@ -244,9 +304,9 @@ class Slicer:
                 name, element, _edge_markers=_edge_markers)
 
             if subsequence is None:
-                subsequence = [name]
-
-            thin_names += subsequence
+                thin_names.append(name)
+            else:
+                thin_names.extend(subsequence)
 
         # Commit the changes to the line
         self._line.element_names = thin_names
@@ -287,12 +347,12 @@ class Slicer:
             if entry_marker not in self._line.element_dict:
                 self._line.element_dict[entry_marker] = xt.Marker(
                                                         _buffer=_buffer)
-                slices_to_add = [entry_marker] + slices_to_add
+                slices_to_add.insert(0, entry_marker)
 
             if exit_marker not in self._line.element_dict:
                 self._line.element_dict[exit_marker] = xt.Marker(
                                                         _buffer=_buffer)
-                slices_to_add += [exit_marker]
+                slices_to_add.append(exit_marker)
 
         # Handle aperture
         ee_for_aper = element
@@ -309,9 +369,9 @@ class Slicer:
                     aper_name = f'{name}_aper..{aper_index}'
                     self._line.element_dict[aper_name] = xt.Replica(
                         parent_name=ee_for_aper.name_associated_aperture)
-                    new_slices_to_add += [aper_name]
+                    new_slices_to_add.append(aper_name)
                     aper_index += 1
-                new_slices_to_add += [nn]
+                new_slices_to_add.append(nn)
             slices_to_add = new_slices_to_add
 
         return slices_to_add
@@ -319,10 +379,28 @@ class Slicer:
     def _scheme_for_element(self, element, name, line):
         """Choose a slicing strategy for the element"""
 
+        # Replicas are resolved when matching on type, so are not cached
+        use_cache = (self._scheme_by_class is not None
+                     and not isinstance(element, xt.Replica))
+        if use_cache and type(element) in self._scheme_by_class:
+            return self._scheme_by_class[type(element)]
+
         slicing_found = False
         chosen_slicing = None
 
-        for strategy in reversed(self._slicing_strategies):
+        # Regex strategies before the first one whose regex matches the name
+        # cannot match the element, and can be skipped
+        first_regex_match = 0
+        if self._fused_name_regex is not None:
+            mm = self._fused_name_regex.match(name)
+            if mm is None:
+                first_regex_match = len(self._strategies_by_priority)
+            else:
+                first_regex_match = int(mm.lastgroup[len('s'):])
+
+        for ii, strategy in enumerate(self._strategies_by_priority):
+            if ii < first_regex_match and _has_name_regex(strategy):
+                continue
             if strategy.match_element(name, element, line):
                 slicing_found = True
                 chosen_slicing = strategy.slicing
@@ -330,6 +408,8 @@ class Slicer:
         if not slicing_found:
             raise ValueError(f'No slicing strategy found for the element '
                              f'{name}: {element}.')
+        if use_cache:
+            self._scheme_by_class[type(element)] = chosen_slicing
         return chosen_slicing
 
     def _make_slices(self, element, chosen_slicing, name):
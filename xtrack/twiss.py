@@ -3,6 +3,7 @@
 # Copyright (c) CERN, 2021.                 #
 # ######################################### #
 
+import inspect
 import logging
 
 import io
@@ -15,11 +16,6 @@ from scipy.constants import epsilon_0
 from scipy.constants import e as qe
 from scipy.special import factorial
 
-if hasattr(np, 'trapezoid'): # numpy >= 2.0
-    trapz = np.trapezoid
-else:
-    trapz = np.trapz
-
 import xobjects as xo
 from xdeps import Table
 
@@ -59,6 +55,11 @@ SKEW_STRENGTHS_FROM_ATTR=['k0sl', 'k1sl', 'k2sl', 'k3sl', 'k4sl', 'k5sl']
 OTHER_FIELDS_FROM_ATTR=['angle_rad', 'rot_s_rad', 'hkick', 'vkick', 'ks', 'length']
 OTHER_FIELDS_FROM_TABLE=['element_type', 'isthick', 'parent_name']
 
+# Element properties: reversed keeping the last (_end_point) row in place
+_REVERSE_ELEMENT_COLUMNS = frozenset(
+    ['name'] + NORMAL_STRENGTHS_FROM_ATTR + SKEW_STRENGTHS_FROM_ATTR
+    + OTHER_FIELDS_FROM_ATTR + OTHER_FIELDS_FROM_TABLE)
+
 log = logging.getLogger(__name__)
 
 def twiss_line(line, particle_ref=None, method=None,
@@ -106,6 +107,7 @@ def twiss_line(line, particle_ref=None, method=None,
         _initial_particles=None,
         _ebe_monitor=None,
         only_markers=None,
+        _input_kwargs=None,
         ):
 
     """
@@ -292,7 +294,13 @@ def twiss_line(line, particle_ref=None, method=None,
 
     """
 
-    input_kwargs = locals().copy()
+    if _input_kwargs is not None:
+        # Re-entry from an outer call that only changed the line configuration,
+        # the action is built from the arguments of the outermost call
+        input_kwargs = _input_kwargs
+    else:
+        loc = locals()
+        input_kwargs = {kk: loc[kk] for kk in _TWISS_LINE_ARG_NAMES}
 
     # defaults
     r_sigma=(r_sigma or 0.01)
@@ -328,7 +336,8 @@ def twiss_line(line, particle_ref=None, method=None,
     if isinstance(init, TwissInit):
         init = init.copy()
 
-    kwargs = locals().copy()
+    loc = locals()
+    kwargs = {kk: loc[kk] for kk in _TWISS_LINE_ARG_NAMES}
 
     if num_turns != 1:
         # Untested cases
@@ -339,7 +348,7 @@ def twiss_line(line, particle_ref=None, method=None,
         assert reverse is False
 
     if zero_at is not None:
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         kwargs.pop('zero_at')
         out = twiss_line(**kwargs)
         out.zero_at(zero_at)
@@ -365,7 +374,7 @@ def twiss_line(line, particle_ref=None, method=None,
 
     if start is not None and end is None:
         # One turn twiss from start to start
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         kwargs.pop('start')
         if (init is None or init == 'periodic') and betx is None and bety is None:
             # Periodic twiss
@@ -395,7 +404,7 @@ def twiss_line(line, particle_ref=None, method=None,
         return _add_action_in_res(out, input_kwargs)
 
     if init == 'full_periodic' and (start is not None or end is not None):
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         kwargs.pop('init')
         kwargs.pop('start')
         kwargs.pop('end')
@@ -413,43 +422,42 @@ def twiss_line(line, particle_ref=None, method=None,
         periodic = True
 
     if freeze_longitudinal:
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         kwargs.pop('freeze_longitudinal')
 
         with xt.freeze_longitudinal(line):
-            return _add_action_in_res(twiss_line(**kwargs), input_kwargs)
+            return twiss_line(**kwargs, _input_kwargs=input_kwargs)
     elif freeze_energy or (freeze_energy is None and method=='4d'):
         if not line._energy_is_frozen():
-            kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+            kwargs = _updated_kwargs_from_locals(kwargs, locals())
             kwargs.pop('freeze_energy')
             with xt.line._preserve_config(line):
                 line.freeze_energy(force=True) # need to force for collective lines
-                return _add_action_in_res(
-                    twiss_line(freeze_energy=False, **kwargs), input_kwargs)
+                return twiss_line(freeze_energy=False, **kwargs,
+                                  _input_kwargs=input_kwargs)
 
     if at_s is not None:
         if reverse:
             raise NotImplementedError('`at_s` not implemented for `reverse`=True')
         # Get all arguments
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         if np.isscalar(at_s):
             at_s = [at_s]
         assert at_elements is None
         (auxtracker, names_inserted_markers
             ) = _build_auxiliary_tracker_with_extra_markers(
             tracker=line.tracker, at_s=at_s, marker_prefix='inserted_twiss_marker',
-            algorithm='insert')
+            algorithm='auto')
         kwargs.pop('line')
         kwargs.pop('at_s')
         kwargs.pop('at_elements')
         kwargs.pop('matrix_responsiveness_tol')
         kwargs.pop('matrix_stability_tol')
-        res = twiss_line(line=auxtracker.line,
+        return twiss_line(line=auxtracker.line,
                         at_elements=names_inserted_markers,
                         matrix_responsiveness_tol=matrix_responsiveness_tol,
                         matrix_stability_tol=matrix_stability_tol,
-                        **kwargs)
-        return _add_action_in_res(res, input_kwargs)
+                        **kwargs, _input_kwargs=input_kwargs)
 
     if radiation_method is None and line._radiation_model is not None:
         if line._radiation_model == 'quantum':
@@ -463,7 +471,7 @@ def twiss_line(line, particle_ref=None, method=None,
         assert not line._context.openmp_enabled, (
             'Twiss with radiation computation is not supported with OpenMP'
             ' parallelization')
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         assert radiation_method in ['full', 'kick_as_co', 'scale_as_co']
         assert freeze_longitudinal is False
         if (radiation_method == 'kick_as_co' and (
@@ -471,13 +479,13 @@ def twiss_line(line, particle_ref=None, method=None,
             not line.config.XTRACK_SYNRAD_KICK_SAME_AS_FIRST)):
             with xt.line._preserve_config(line):
                 line.config.XTRACK_SYNRAD_KICK_SAME_AS_FIRST = True
-                return _add_action_in_res(twiss_line(**kwargs), input_kwargs)
+                return twiss_line(**kwargs, _input_kwargs=input_kwargs)
         elif (radiation_method == 'scale_as_co' and (
             not hasattr(line.config, 'XTRACK_SYNRAD_SCALE_SAME_AS_FIRST') or
             not line.config.XTRACK_SYNRAD_SCALE_SAME_AS_FIRST)):
             with xt.line._preserve_config(line):
                 line.config.XTRACK_SYNRAD_SCALE_SAME_AS_FIRST = True
-                return _add_action_in_res(twiss_line(**kwargs), input_kwargs)
+                return twiss_line(**kwargs, _input_kwargs=input_kwargs)
 
     if radiation_method == 'kick_as_co':
         assert hasattr(line.config, 'XTRACK_SYNRAD_KICK_SAME_AS_FIRST')
@@ -523,7 +531,7 @@ def twiss_line(line, particle_ref=None, method=None,
     if not periodic and (
         rv * _str_to_index(line, start) > rv * _str_to_index(line, end)):
 
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         tw_res = _handle_loop_around(kwargs)
 
         return _add_action_in_res(tw_res, input_kwargs)
@@ -533,7 +541,7 @@ def twiss_line(line, particle_ref=None, method=None,
             and init.element_name != start
             and init.element_name != end):
 
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         tw_res = _handle_init_inside_range(kwargs)
 
         return _add_action_in_res(tw_res, input_kwargs)
@@ -759,11 +767,25 @@ def twiss_line(line, particle_ref=None, method=None,
         twiss_res._data['values_at'] = 'entry'
 
     if strengths:
-        tt = line.get_table(attr=True).rows[list(twiss_res.name)]
+        # Gathered by index from the attribute cache, instead of building the
+        # full element table and selecting its rows by name
+        name_to_index = _name_to_index_map(line)
+        n_elements = len(line.element_names)
+        idx = np.array([n_elements if nn == '_end_point' else name_to_index[nn]
+                        for nn in twiss_res.name], dtype=np.int64)
         for kk in (NORMAL_STRENGTHS_FROM_ATTR + SKEW_STRENGTHS_FROM_ATTR
-                   + OTHER_FIELDS_FROM_ATTR + OTHER_FIELDS_FROM_TABLE):
+                   + OTHER_FIELDS_FROM_ATTR):
+            this_attr = line.attr[kk]
+            if hasattr(this_attr, 'get'):
+                this_attr = this_attr.get() # bring to cpu
+            # Add zero at the end (there is _end_point)
+            this_attr = np.concatenate((this_attr, [this_attr[-1]*0]))
+            twiss_res._col_names.append(kk)
+            twiss_res._data[kk] = this_attr[idx]
+        table_columns = _element_table_columns(line)
+        for kk in OTHER_FIELDS_FROM_TABLE:
             twiss_res._col_names.append(kk)
-            twiss_res._data[kk] = tt[kk].copy()
+            twiss_res._data[kk] = table_columns[kk][idx]
 
     twiss_res._data['method'] = method
     twiss_res._data['radiation_method'] = radiation_method
@@ -801,7 +823,7 @@ def twiss_line(line, particle_ref=None, method=None,
 
     if num_turns > 1:
 
-        kwargs = _updated_kwargs_from_locals(kwargs, locals().copy())
+        kwargs = _updated_kwargs_from_locals(kwargs, locals())
         kwargs.pop('num_turns')
         kwargs.pop('init')
         kwargs.pop('start')
@@ -817,6 +839,18 @@ def twiss_line(line, particle_ref=None, method=None,
 
     return _add_action_in_res(twiss_res, input_kwargs)
 
+# Arguments forwarded when twiss_line calls itself
+_TWISS_LINE_ARG_NAMES = tuple(
+    nn for nn in inspect.signature(twiss_line).parameters
+    if nn != '_input_kwargs')
+
+_VARS_HIDE_THIN_GROUPS = (
+    'x', 'px', 'y', 'py', 'zeta', 'delta', 'ptau',
+    'betx', 'bety', 'alfx', 'alfy', 'gamx', 'gamy',
+    'betx1', 'bety1', 'betx2', 'bety2',
+    'dx', 'dpx', 'dy', 'dzeta', 'dpy',
+)
+
 def _twiss_open(line, init,
                       start, end,
                       nemitt_x, nemitt_y, r_sigma,
@@ -837,6 +871,7 @@ def _twiss_open(line, init,
 
     particle_on_co = init.particle_on_co
     W_matrix = init.W_matrix
+    element_names = line.element_names
 
     if start is not None and end is None:
         raise ValueError('end must be specified if start is not None')
@@ -848,53 +883,56 @@ def _twiss_open(line, init,
         start = 0
 
     if isinstance(start, str):
-        start = line.element_names.index(start)
+        start = _str_to_index(line, start, allow_end_point=False)
     if isinstance(end, str):
         if end == '_end_point':
-            end = len(line.element_names) - 1
+            end = len(element_names) - 1
         else:
-            end = line.element_names.index(end)
+            end = _str_to_index(line, end, allow_end_point=False)
 
-    if init.element_name == line.element_names[start]:
+    if init.element_name == element_names[start]:
         twiss_orientation = 'forward'
-    elif init.element_name == '_end_point' and end == len(line.element_names) - 1:
+    elif init.element_name == '_end_point' and end == len(element_names) - 1:
         twiss_orientation = 'backward'
-    elif end is not None and init.element_name == line.element_names[end]:
+    elif end is not None and init.element_name == element_names[end]:
         twiss_orientation = 'backward'
     else:
         raise ValueError(
             '`init` must be given at the start or end of the specified element range.')
 
-    ctx2np = line._context.nparray_from_context_array
+    context = line._context
+    ctx2np = context.nparray_from_context_array
+    tracker_data_base = line.tracker._tracker_data_base
+    beta0 = particle_on_co._xobject.beta0[0]
+    gamma0 = particle_on_co._xobject.gamma0[0]
 
-    gemitt_x = nemitt_x/particle_on_co._xobject.beta0[0]/particle_on_co._xobject.gamma0[0]
-    gemitt_y = nemitt_y/particle_on_co._xobject.beta0[0]/particle_on_co._xobject.gamma0[0]
+    gemitt_x = nemitt_x/beta0/gamma0
+    gemitt_y = nemitt_y/beta0/gamma0
     scale_transverse_x = np.sqrt(gemitt_x)*r_sigma
     scale_transverse_y = np.sqrt(gemitt_y)*r_sigma
     scale_longitudinal = delta_disp
     scale_eigen = min(scale_transverse_x, scale_transverse_y, scale_longitudinal)
 
-    context = line._context
     if _initial_particles is not None: # used in match
         part_for_twiss = _initial_particles.copy()
     else:
         import xpart
+        # Particle 0 on the closed orbit, then 6 + 6 probes displaced by
+        # -/+ scale_eigen along the eigenvectors (columns of W_matrix)
+        probes = np.zeros(shape=(6, 13), dtype=np.float64)
+        probes[:, 1:7] = W_matrix * -scale_eigen
+        probes[:, 7:13] = W_matrix * scale_eigen
         part_for_twiss = xpart.build_particles(_context=context,
             particle_ref=particle_on_co, mode='shift',
-            x     = [0] + list(W_matrix[0, :] * -scale_eigen) + list(W_matrix[0, :] * scale_eigen),
-            px    = [0] + list(W_matrix[1, :] * -scale_eigen) + list(W_matrix[1, :] * scale_eigen),
-            y     = [0] + list(W_matrix[2, :] * -scale_eigen) + list(W_matrix[2, :] * scale_eigen),
-            py    = [0] + list(W_matrix[3, :] * -scale_eigen) + list(W_matrix[3, :] * scale_eigen),
-            zeta  = [0] + list(W_matrix[4, :] * -scale_eigen) + list(W_matrix[4, :] * scale_eigen),
-            pzeta = [0] + list(W_matrix[5, :] * -scale_eigen) + list(W_matrix[5, :] * scale_eigen),
-            )
+            x=probes[0], px=probes[1], y=probes[2], py=probes[3],
+            zeta=probes[4], pzeta=probes[5])
 
         if twiss_orientation == 'forward':
             part_for_twiss.at_element = start
-            part_for_twiss.s = line.tracker._tracker_data_base.element_s_locations[start]
+            part_for_twiss.s = tracker_data_base.element_s_locations[start]
         elif twiss_orientation == 'backward':
             part_for_twiss.at_element = end + 1 # to include the last element
-            part_for_twiss.s = line.tracker._tracker_data_base.element_s_locations[end]
+            part_for_twiss.s = tracker_data_base.element_s_locations[end]
         else:
             raise ValueError('Invalid twiss_orientation')
 
@@ -905,8 +943,8 @@ def _twiss_open(line, init,
 
     if _ebe_monitor is not None:
         _monitor = _ebe_monitor
-    elif hasattr(line.tracker._tracker_data_base, '_reusable_ebe_monitor_for_twiss'):
-        _monitor = line.tracker._tracker_data_base._reusable_ebe_monitor_for_twiss
+    elif hasattr(tracker_data_base, '_reusable_ebe_monitor_for_twiss'):
+        _monitor = tracker_data_base._reusable_ebe_monitor_for_twiss
     else:
         _monitor = 'ONE_TURN_EBE'
 
@@ -922,8 +960,10 @@ def _twiss_open(line, init,
 
     # We keep the monitor to speed up future calls (attached to tracker data
     # so that it is trashed if number of elements changes)
-    line.tracker._tracker_data_base._reusable_ebe_monitor_for_twiss = line.record_last_track
+    tracker_data_base._reusable_ebe_monitor_for_twiss = line.record_last_track
 
+    # Lost particles keep their state, so checking it at the end of the
+    # tracking covers the whole element range
     if not _continue_if_lost:
         assert np.all(ctx2np(part_for_twiss.state) == 1), (
             'Some test particles were lost during twiss! '
@@ -934,58 +974,48 @@ def _twiss_open(line, init,
         i_start = start
         i_stop = part_for_twiss._xobject.at_element[0] + (
                 (part_for_twiss._xobject.at_turn[0] - AT_TURN_FOR_TWISS)
-                * len(line.element_names))
+                * len(element_names))
     elif twiss_orientation == 'backward':
         i_start = start
         if ele_stop_track is not None:
             i_stop = ele_stop_track
         else:
-            i_stop = len(line.element_names) - 1
-
-    recorded_state = line.record_last_track.state[:, i_start:i_stop+1].copy()
-    if not _continue_if_lost:
-        assert np.all(recorded_state == 1), (
-             'Some test particles were lost during twiss! '
-          + f'(state {np.unique(recorded_state)}, '
-          + f'at element {np.unique(line.record_last_track.at_element[:, i_start:i_stop+1].copy())})')
-
-    x_co = line.record_last_track.x[0, i_start:i_stop+1].copy()
-    y_co = line.record_last_track.y[0, i_start:i_stop+1].copy()
-    px_co = line.record_last_track.px[0, i_start:i_stop+1].copy()
-    py_co = line.record_last_track.py[0, i_start:i_stop+1].copy()
-    zeta_co = line.record_last_track.zeta[0, i_start:i_stop+1].copy()
-    delta_co = np.array(line.record_last_track.delta[0, i_start:i_stop+1].copy())
-    ptau_co = np.array(line.record_last_track.ptau[0, i_start:i_stop+1].copy())
-    s_co = line.record_last_track.s[0, i_start:i_stop+1].copy()
-    kin_px_co = line.record_last_track.kin_px[0, i_start:i_stop+1].copy()
-    kin_py_co = line.record_last_track.kin_py[0, i_start:i_stop+1].copy()
-    kin_ps_co = line.record_last_track.kin_ps[0, i_start:i_stop+1].copy()
-    kin_xprime_co = line.record_last_track.kin_xprime[0, i_start:i_stop+1].copy()
-    kin_yprime_co = line.record_last_track.kin_yprime[0, i_start:i_stop+1].copy()
-
-    Ws = np.zeros(shape=(len(s_co), 6, 6), dtype=np.float64)
-    Ws[:, 0, :] = 0.5 * (line.record_last_track.x[1:7, i_start:i_stop+1] - x_co).T / scale_eigen
-    Ws[:, 1, :] = 0.5 * (line.record_last_track.px[1:7, i_start:i_stop+1] - px_co).T / scale_eigen
-    Ws[:, 2, :] = 0.5 * (line.record_last_track.y[1:7, i_start:i_stop+1] - y_co).T / scale_eigen
-    Ws[:, 3, :] = 0.5 * (line.record_last_track.py[1:7, i_start:i_stop+1] - py_co).T / scale_eigen
-    Ws[:, 4, :] = 0.5 * (line.record_last_track.zeta[1:7, i_start:i_stop+1] - zeta_co).T / scale_eigen
-    Ws[:, 5, :] = 0.5 * (line.record_last_track.ptau[1:7, i_start:i_stop+1] - ptau_co).T / particle_on_co._xobject.beta0[0] / scale_eigen
-
-    Ws[:, 0, :] -= 0.5 * (line.record_last_track.x[7:13, i_start:i_stop+1] - x_co).T / scale_eigen
-    Ws[:, 1, :] -= 0.5 * (line.record_last_track.px[7:13, i_start:i_stop+1] - px_co).T / scale_eigen
-    Ws[:, 2, :] -= 0.5 * (line.record_last_track.y[7:13, i_start:i_stop+1] - y_co).T / scale_eigen
-    Ws[:, 3, :] -= 0.5 * (line.record_last_track.py[7:13, i_start:i_stop+1] - py_co).T / scale_eigen
-    Ws[:, 4, :] -= 0.5 * (line.record_last_track.zeta[7:13, i_start:i_stop+1] - zeta_co).T / scale_eigen
-    Ws[:, 5, :] -= 0.5 * (line.record_last_track.ptau[7:13, i_start:i_stop+1] - ptau_co).T / particle_on_co._xobject.beta0[0] / scale_eigen
-
-    dzeta = (((line.record_last_track.zeta[6, i_start:i_stop+1] - zeta_co).T
-            - (line.record_last_track.zeta[12, i_start:i_stop+1] - zeta_co).T )
-            / ((line.record_last_track.delta[6, i_start:i_stop+1] - delta_co).T
-            - (line.record_last_track.delta[12, i_start:i_stop+1] - delta_co).T))
-
-    dzeta = dzeta - dzeta[0]
-
-    name_co = np.array(line.element_names[i_start:i_stop] + ('_end_point',))
+            i_stop = len(element_names) - 1
+
+    # Each monitor field access transfers the full record to numpy, so every
+    # coordinate is fetched only once and sliced locally
+    monitor = line.record_last_track
+    rec = {nn: np.array(getattr(monitor, nn)[:, i_start:i_stop+1])
+           for nn in ('x', 'px', 'y', 'py', 'zeta', 'delta', 'ptau', 's')}
+
+    x_co = rec['x'][0].copy()
+    y_co = rec['y'][0].copy()
+    px_co = rec['px'][0].copy()
+    py_co = rec['py'][0].copy()
+    zeta_co = rec['zeta'][0].copy()
+    delta_co = rec['delta'][0].copy()
+    ptau_co = rec['ptau'][0].copy()
+    s_co = rec['s'][0].copy()
+    kin_px_co = monitor.kin_px[0, i_start:i_stop+1].copy()
+    kin_py_co = monitor.kin_py[0, i_start:i_stop+1].copy()
+    kin_ps_co = monitor.kin_ps[0, i_start:i_stop+1].copy()
+    kin_xprime_co = monitor.kin_xprime[0, i_start:i_stop+1].copy()
+    kin_yprime_co = monitor.kin_yprime[0, i_start:i_stop+1].copy()
+
+    # Central differences between the probes displaced by +/- scale_eigen
+    # along each eigenvector (the closed orbit cancels out)
+    Ws = np.empty(shape=(len(s_co), 6, 6), dtype=np.float64)
+    for ii, nn in enumerate(['x', 'px', 'y', 'py', 'zeta', 'ptau']):
+        Ws[:, ii, :] = (rec[nn][1:7, :] - rec[nn][7:13, :]).T
+    Ws[:, :5, :] *= 0.5 / scale_eigen
+    Ws[:, 5, :] *= 0.5 / (scale_eigen * beta0) # ptau -> pzeta
+
+    # The closed orbit cancels out in both differences
+    dzeta = ((rec['zeta'][6, :] - rec['zeta'][12, :])
+             / (rec['delta'][6, :] - rec['delta'][12, :]))
+    dzeta -= dzeta[0]
+
+    name_co = np.array(element_names[i_start:i_stop] + ('_end_point',))
 
     if only_markers:
         raise NotImplementedError('only_markers not supported anymore')
@@ -1024,15 +1054,8 @@ def _twiss_open(line, init,
     if _keep_initial_particles:
         extra_data['_initial_particles'] = part_for_twiss0.copy()
 
-    if hide_thin_groups:
-        _vars_hide_changes = [
-        'x', 'px', 'y', 'py', 'zeta', 'delta', 'ptau',
-        'betx', 'bety', 'alfx', 'alfy', 'gamx', 'gamy',
-        'betx1', 'bety1', 'betx2', 'bety2',
-        'dx', 'dpx', 'dy', 'dzeta', 'dpy',
-        ]
-
-        for key in _vars_hide_changes:
+    if hide_thin_groups and len(i_replace) > 0:
+        for key in _VARS_HIDE_THIN_GROUPS:
             if key in twiss_res_element_by_element:
                 twiss_res_element_by_element[key][i_replace] = np.nan
 
@@ -1043,7 +1066,7 @@ def _twiss_open(line, init,
 
     twiss_res._data['particle_on_co'] = particle_on_co.copy(_context=xo.context_default)
 
-    circumference = line.tracker._tracker_data_base.line_length
+    circumference = tracker_data_base.line_length
     twiss_res._data['circumference'] = circumference
     twiss_res._data['orientation'] = twiss_orientation
 
@@ -1052,16 +1075,15 @@ def _twiss_open(line, init,
 
 def _compute_lattice_functions(Ws, use_full_inverse, s_co):
 
-    # For removal ot thin groups of elements
-    i_take = [0]
-    for ii in range(1, len(s_co)):
-        if s_co[ii] > s_co[ii-1]:
-            i_take[-1] = ii-1
-            i_take.append(ii)
-        else:
-            i_take.append(i_take[-1])
-    i_take = np.array(i_take)
+    # For removal ot thin groups of elements (elements at the same s take the
+    # values of the first of the group, except for the last one of the group)
     _temp_range = np.arange(0, len(s_co), 1, dtype=int)
+    s_increases = s_co[1:] > s_co[:-1]
+    is_group_start = np.concatenate(([True], s_increases))
+    is_group_end = np.concatenate((s_increases, [False]))
+    i_group_start = np.maximum.accumulate(
+                                np.where(is_group_start, _temp_range, 0))
+    i_take = np.where(is_group_end, _temp_range, i_group_start)
     mask_replace = _temp_range != i_take
     mask_replace[-1] = False # Force keeping of the last element
     i_replace = _temp_range[mask_replace]
@@ -1071,41 +1093,42 @@ def _compute_lattice_functions(Ws, use_full_inverse, s_co):
     nux, nuy, nuzeta = _renormalize_eigenvectors(Ws)
 
     # Rotate eigenvectors to the Courant-Snyder basis
-    phix = np.arctan2(Ws[:, 0, 1], Ws[:, 0, 0])
-    phiy = np.arctan2(Ws[:, 2, 3], Ws[:, 2, 2])
-    phizeta = np.arctan2(Ws[:, 4, 5], Ws[:, 4, 4])
-
-    v1 = Ws[:, :, 0] + 1j * Ws[:, :, 1]
-    v2 = Ws[:, :, 2] + 1j * Ws[:, :, 3]
-    v3 = Ws[:, :, 4] + 1j * Ws[:, :, 5]
-
-    for ii in range(6):
-        v1[:, ii] *= np.exp(-1j * phix)
-        v2[:, ii] *= np.exp(-1j * phiy)
-        v3[:, ii] *= np.exp(-1j * phizeta)
-    Ws[:, :, 0] = np.real(v1)
-    Ws[:, :, 1] = np.imag(v1)
-    Ws[:, :, 2] = np.real(v2)
-    Ws[:, :, 3] = np.imag(v2)
-    Ws[:, :, 4] = np.real(v3)
-    Ws[:, :, 5] = np.imag(v3)
+    # (phases of the x, y and zeta modes, computed together)
+    phis = np.arctan2(Ws[:, [0, 2, 4], [1, 3, 5]], Ws[:, [0, 2, 4], [0, 2, 4]])
+    phix = phis[:, 0]
+    phiy = phis[:, 1]
+    phizeta = phis[:, 2]
+
+    # (W[:, :, 2k] + 1j * W[:, :, 2k+1]) * exp(-1j * phi_k) for the three
+    # modes at once, in place and without complex temporaries
+    cos_phis = np.cos(phis)[:, np.newaxis, :]
+    sin_phis = np.sin(phis)[:, np.newaxis, :]
+    w_re = Ws[:, :, 0::2].copy()
+    w_im = Ws[:, :, 1::2]
+    Ws[:, :, 0::2] = w_re * cos_phis + w_im * sin_phis
+    Ws[:, :, 1::2] = w_im * cos_phis - w_re * sin_phis
 
     # Computation of twiss parameters
     if use_full_inverse:
         (betx, alfx, gamx, bety, alfy, gamy, bety1, betx2
                     )= _extract_twiss_parameters_with_inverse(Ws)
     else:
-        betx = Ws[:, 0, 0]**2 + Ws[:, 0, 1]**2
-        bety = Ws[:, 2, 2]**2 + Ws[:, 2, 3]**2
+        # Transverse block indexed as [element, coordinate, mode, re/im]
+        W4 = Ws[:, :4, :4].reshape(-1, 4, 2, 2)
+
+        # Squared norms of all (coordinate, mode) pairs in one pass
+        sq = np.einsum('nipk,nipk->nip', W4, W4)
+        betx = sq[:, 0, 0]
+        bety = sq[:, 2, 1]
 
-        gamx = Ws[:, 1, 0]**2 + Ws[:, 1, 1]**2
-        gamy = Ws[:, 3, 2]**2 + Ws[:, 3, 3]**2
+        gamx = sq[:, 1, 0]
+        gamy = sq[:, 3, 1]
 
-        alfx = -Ws[:, 0, 0] * Ws[:, 1, 0] - Ws[:, 0, 1] * Ws[:, 1, 1]
-        alfy = -Ws[:, 2, 2] * Ws[:, 3, 2] - Ws[:, 2, 3] * Ws[:, 3, 3]
+        alfx = -np.einsum('nk,nk->n', W4[:, 0, 0], W4[:, 1, 0])
+        alfy = -np.einsum('nk,nk->n', W4[:, 2, 1], W4[:, 3, 1])
 
-        bety1 = Ws[:, 2, 0]**2 + Ws[:, 2, 1]**2
-        betx2 = Ws[:, 0, 2]**2 + Ws[:, 0, 3]**2
+        bety1 = sq[:, 2, 0]
+        betx2 = sq[:, 0, 1]
 
         # Untested:
         # alfx2 = -Ws[:, 0, 2] * Ws[:, 1, 2] - Ws[:, 0, 3] * Ws[:, 1, 3]
@@ -1117,34 +1140,28 @@ def _compute_lattice_functions(Ws, use_full_inverse, s_co):
     bety2 = bety
 
 
-    temp_phix = phix.copy()
-    temp_phiy = phiy.copy()
-    temp_phix[i_replace] = temp_phix[i_replace_with]
-    temp_phiy[i_replace] = temp_phiy[i_replace_with]
+    # Unwrap the three phases together (replacement only for transverse ones)
+    temp_phis = phis.copy()
+    temp_phis[i_replace, :2] = temp_phis[i_replace_with, :2]
+
+    mux, muy, muzeta = (np.unwrap(temp_phis, axis=0) / 2 / np.pi).T.copy()
+
+    # Longitudinal block read once into contiguous arrays
+    W44, W45, W54, W55 = Ws[:, 4:, 4:].reshape(-1, 4).T.copy()
 
-    mux = np.unwrap(temp_phix) / 2 / np.pi
-    muy = np.unwrap(temp_phiy) / 2  /np.pi
-    muzeta = np.unwrap(phizeta) / 2 / np.pi
+    # The four transverse coordinates share the same ratios and denominators
+    r54 = W54 / W55
+    r45 = W45 / W44
 
     # Crab dispersion
-    dx_zeta = (Ws[:, 0, 4] - Ws[:, 0, 5] * Ws[:, 5, 4] / Ws[:, 5, 5]) / (
-               Ws[:, 4, 4] - Ws[:, 4, 5] * Ws[:, 5, 4] / Ws[:, 5, 5])
-    dpx_zeta = (Ws[:, 1, 4] - Ws[:, 1, 5] * Ws[:, 5, 4] / Ws[:, 5, 5]) / (
-                Ws[:, 4, 4] - Ws[:, 4, 5] * Ws[:, 5, 4] / Ws[:, 5, 5])
-    dy_zeta = (Ws[:, 2, 4] - Ws[:, 2, 5] * Ws[:, 5, 4] / Ws[:, 5, 5]) / (
-                Ws[:, 4, 4] - Ws[:, 4, 5] * Ws[:, 5, 4] / Ws[:, 5, 5])
-    dpy_zeta = (Ws[:, 3, 4] - Ws[:, 3, 5] * Ws[:, 5, 4] / Ws[:, 5, 5]) / (
-                Ws[:, 4, 4] - Ws[:, 4, 5] * Ws[:, 5, 4] / Ws[:, 5, 5])
+    d_zeta = ((Ws[:, :4, 4] - Ws[:, :4, 5] * r54[:, np.newaxis])
+              / (W44 - W45 * r54)[:, np.newaxis])
+    dx_zeta, dpx_zeta, dy_zeta, dpy_zeta = d_zeta.T.copy()
 
     # Dispersion
-    dx_pzeta = (Ws[:, 0, 5] - Ws[:, 0, 4] * Ws[:, 4, 5] / Ws[:, 4, 4]) / (
-                Ws[:, 5, 5] - Ws[:, 5, 4] * Ws[:, 4, 5] / Ws[:, 4, 4])
-    dpx_pzeta = (Ws[:, 1, 5] - Ws[:, 1, 4] * Ws[:, 4, 5] / Ws[:, 4, 4]) / (
-                Ws[:, 5, 5] - Ws[:, 5, 4] * Ws[:, 4, 5] / Ws[:, 4, 4])
-    dy_pzeta = (Ws[:, 2, 5] - Ws[:, 2, 4] * Ws[:, 4, 5] / Ws[:, 4, 4]) / (
-                Ws[:, 5, 5] - Ws[:, 5, 4] * Ws[:, 4, 5] / Ws[:, 4, 4])
-    dpy_pzeta = (Ws[:, 3, 5] - Ws[:, 3, 4] * Ws[:, 4, 5] / Ws[:, 4, 4]) / (
-                Ws[:, 5, 5] - Ws[:, 5, 4] * Ws[:, 4, 5] / Ws[:, 4, 4])
+    d_pzeta = ((Ws[:, :4, 5] - Ws[:, :4, 4] * r45[:, np.newaxis])
+               / (W55 - W54 * r45)[:, np.newaxis])
+    dx_pzeta, dpx_pzeta, dy_pzeta, dpy_pzeta = d_pzeta.T.copy()
 
     mux = mux - mux[0]
     muy = muy - muy[0]
@@ -1202,7 +1219,6 @@ def _compute_global_quantities(line, twiss_res):
         twiss_res._data.update({
             'slip_factor': eta, 'momentum_compaction_factor': alpha, 'bets0': bets0,
             'circumference': circumference, 'T_rev0': T_rev0,
-            'particle_on_co':part_on_co.copy(_context=xo.context_default),
             'gamma0': part_on_co._xobject.gamma0[0],
             'beta0': part_on_co._xobject.beta0[0],
             'p0c': part_on_co._xobject.p0c[0],
@@ -1225,9 +1241,13 @@ def _compute_global_quantities(line, twiss_res):
             cmin_arr = (2 * np.sqrt(r1*r2) *
                         np.abs(np.mod(mux[-1], 1) - np.mod(muy[-1], 1))
                         /(1 + r1 * r2))
-            c_minus = trapz(cmin_arr, s_vect)/(circumference)
-            c_r1_avg = trapz(r1, s_vect)/(circumference)
-            c_r2_avg = trapz(r2, s_vect)/(circumference)
+            # Trapezoidal rule, with the weights shared by the three averages
+            ds = np.diff(s_vect)
+            w_trapz = np.zeros(len(s_vect))
+            w_trapz[:-1] += 0.5 * ds
+            w_trapz[1:] += 0.5 * ds
+            c_minus, c_r1_avg, c_r2_avg = (
+                np.stack([cmin_arr, r1, r2]) @ w_trapz / circumference)
 
             qs = np.abs(twiss_res['muzeta'][-1])
 
@@ -1398,17 +1418,17 @@ def _compute_chromatic_functions(line, init, delta_chrom, steps_r_matrix,
 def _compute_eneloss_and_damping_rates(particle_on_co, R_matrix,
                                        px_co, py_co, ptau_co, W_matrix,
                                        T_rev0, line, radiation_method):
-    diff_ptau = np.diff(ptau_co)
-    mask_loss = diff_ptau < 0
-    eloss_turn = -sum(diff_ptau[mask_loss]) * particle_on_co._xobject.p0c[0]
+    # Only energy losses (negative steps) contribute
+    diff_ptau_loss = np.minimum(np.diff(ptau_co), 0)
+    eloss_turn = -float(diff_ptau_loss.sum()) * particle_on_co._xobject.p0c[0]
 
     # Get eigenvalues
     w0, v0 = np.linalg.eig(R_matrix)
 
     # Sort eigenvalues
-    indx = [
-        int(np.floor(np.argmax(np.abs(v0[:, 2*ii]))/2)) for ii in range(3)]
-    eigenvals = np.array([w0[ii*2] for ii in indx])
+    # (plane of the largest component of each of the three even eigenvectors)
+    indx = np.argmax(np.abs(v0[:, ::2]), axis=0) // 2
+    eigenvals = w0[indx * 2]
 
     # Damping constants and partition numbers
     energy0 = particle_on_co.mass0 * particle_on_co._xobject.gamma0[0]
@@ -1419,7 +1439,7 @@ def _compute_eneloss_and_damping_rates(particle_on_co, R_matrix,
     # https://cds.cern.ch/record/175614 , Eq. 4.24
     partition_numbers = (
         damping_constants_turns * 2
-        / (-np.sum(diff_ptau[mask_loss] / (1 + ptau_co[:-1][mask_loss]))))
+        / (-np.sum(diff_ptau_loss / (1 + ptau_co[:-1]))))
 
     eneloss_damp_res = {
         'eneloss_turn': eloss_turn,
@@ -2068,10 +2088,10 @@ def find_closed_orbit_line(line, co_guess=None, particle_ref=None,
         return p_co_at_ele_co_search
 
     if isinstance(start, str):
-        start = line.element_names.index(start)
+        start = _str_to_index(line, start, allow_end_point=False)
 
     if isinstance(end, str):
-        end = line.element_names.index(end)
+        end = _str_to_index(line, end, allow_end_point=False)
 
     if isinstance(co_guess, dict):
         co_guess = line.build_particles(**co_guess)
@@ -2203,34 +2223,22 @@ def _error_for_co_search_6d(p, co_guess, line, delta_zeta, delta0, zeta0, start,
     return p - _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
 
 def _error_for_co_search_4d_delta0(p, co_guess, line, delta_zeta, delta0, zeta0, start, end, num_turns):
-    one_turn_res = _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
-    return np.array([
-        p[0] - one_turn_res[0],
-        p[1] - one_turn_res[1],
-        p[2] - one_turn_res[2],
-        p[3] - one_turn_res[3],
-        0,
-        p[5] - delta0])
+    err = p - _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
+    err[4] = 0
+    err[5] = p[5] - delta0
+    return err
 
 def _error_for_co_search_4d_zeta0(p, co_guess, line, delta_zeta, delta0, zeta0, start, end, num_turns):
-    one_turn_res = _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
-    return np.array([
-        p[0] - one_turn_res[0],
-        p[1] - one_turn_res[1],
-        p[2] - one_turn_res[2],
-        p[3] - one_turn_res[3],
-        p[4] - zeta0,
-        0])
+    err = p - _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
+    err[4] = p[4] - zeta0
+    err[5] = 0
+    return err
 
 def _error_for_co_search_4d_delta0_zeta0(p, co_guess, line, delta_zeta, delta0, zeta0, start, end, num_turns):
-    one_turn_res = _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
-    return np.array([
-        p[0] - one_turn_res[0],
-        p[1] - one_turn_res[1],
-        p[2] - one_turn_res[2],
-        p[3] - one_turn_res[3],
-        p[4] - zeta0,
-        p[5] - delta0])
+    err = p - _one_turn_map(p, co_guess, line, delta_zeta, start, end, num_turns)
+    err[4] = p[4] - zeta0
+    err[5] = p[5] - delta0
+    return err
 
 def compute_one_turn_matrix_finite_differences(
         line, particle_on_co,
@@ -2251,18 +2259,19 @@ def compute_one_turn_matrix_finite_differences(
             'Time-dependent vars not supported in one-turn matrix computation')
 
     if isinstance(start, str):
-        start = line.element_names.index(start)
+        start = _str_to_index(line, start, allow_end_point=False)
 
     if isinstance(end, str):
-        end = line.element_names.index(end)
+        end = _str_to_index(line, end, allow_end_point=False)
 
     if start is not None and end is not None and start > end:
         raise ValueError('start > end')
 
     context = line._buffer.context
 
-    particle_on_co = particle_on_co.copy(
-                        _context=context)
+    # Only read here, no need to copy if already on the right context
+    if particle_on_co._context is not context:
+        particle_on_co = particle_on_co.copy(_context=context)
 
     dx = steps_r_matrix["dx"]
     dpx = steps_r_matrix["dpx"]
@@ -2349,30 +2358,23 @@ def compute_one_turn_matrix_finite_differences(
 
 
 def _updated_kwargs_from_locals(kwargs, loc):
-
-    out = kwargs.copy()
-
-    for kk in kwargs.keys():
-        if kk in loc:
-            out[kk] = loc[kk]
-
-    out.pop('input_kwargs', None)
-
-    return out
+    # `loc` is only read, no need to copy the locals() of the caller
+    return {kk: loc.get(kk, vv) for kk, vv in kwargs.items()}
 
 
 def _build_auxiliary_tracker_with_extra_markers(tracker, at_s, marker_prefix,
                                                 algorithm='auto'):
 
-    assert algorithm in ['auto', 'insert', 'regen_all_drift']
+    assert algorithm in ['auto', 'insert', 'sorted']
     if algorithm == 'auto':
         if len(at_s)<10:
             algorithm = 'insert'
         else:
-            algorithm = 'regen_all_drifts'
+            algorithm = 'sorted'
 
-    auxline = xt.Line(elements=tracker.line.element_dict.copy(),
-                      element_names=list(tracker.line.element_names).copy())
+    # Line makes its own copies of the element dict and names
+    auxline = xt.Line(elements=tracker.line.element_dict,
+                      element_names=tracker.line.element_names)
     if tracker.line.particle_ref is not None:
         auxline.particle_ref = tracker.line.particle_ref.copy()
 
@@ -2384,8 +2386,12 @@ def _build_auxiliary_tracker_with_extra_markers(tracker, at_s, marker_prefix,
         markers.append(xt.Drift(length=0))
 
     auxline.cut_at_s(at_s)
-    for nn, mm, ss in zip(names_inserted_markers, markers, at_s):
-        auxline.insert_element(element=mm, name=nn, at_s=ss)
+    if algorithm == 'sorted':
+        algorithm = _insert_markers_sorted(
+            auxline, names_inserted_markers, markers, at_s)
+    if algorithm == 'insert':
+        for nn, mm, ss in zip(names_inserted_markers, markers, at_s):
+            auxline.insert_element(element=mm, name=nn, at_s=ss)
 
     auxtracker = xt.Tracker(
         _buffer=tracker._buffer,
@@ -2400,6 +2406,55 @@ def _build_auxiliary_tracker_with_extra_markers(tracker, at_s, marker_prefix,
     return auxtracker, names_inserted_markers
 
 
+def _insert_markers_sorted(line, names, markers, at_s, s_tol=1e-6):
+
+    # Same placement as inserting the markers one by one with
+    # `insert_element(at_s=...)` (before the first element starting at that s,
+    # later markers before earlier ones at equal s) but with a single rebuild
+    # of the element names. Returns 'insert' if the fallback is needed.
+    s_up = np.array(line.get_s_position(mode='upstream'))
+    at_s = np.atleast_1d(np.array(at_s, dtype=float))
+    if len(s_up) == 0 or np.any(np.diff(s_up) < 0):
+        return 'insert'
+
+    i_right = np.clip(np.searchsorted(s_up, at_s, side='left'),
+                      0, len(s_up) - 1)
+    i_left = np.maximum(i_right - 1, 0)
+    i_closest = np.where(np.abs(s_up[i_right] - at_s)
+                         < np.abs(s_up[i_left] - at_s), i_right, i_left)
+    if np.any(np.abs(s_up[i_closest] - at_s) >= s_tol):
+        return 'insert'
+    i_insert = np.searchsorted(s_up, s_up[i_closest], side='left')
+
+    old_names = line.element_names
+    new_names = []
+    i_prev = 0
+    for jj in np.lexsort((-np.arange(len(at_s)), i_insert)):
+        new_names.extend(old_names[i_prev:i_insert[jj]])
+        new_names.append(names[jj])
+        i_prev = i_insert[jj]
+    new_names.extend(old_names[i_prev:])
+
+    for nn, mm in zip(names, markers):
+        line.element_dict[nn] = mm
+    line.element_names = new_names
+
+    return 'sorted'
+
+
+# Sign of x, px, y, py, zeta, pzeta when reversing the line
+_W_MATRIX_REVERSE_SIGNS = np.array([-1., 1., 1., -1., -1., 1.])
+
+# Twiss table columns changing sign when reversing the line, each group
+# applied only if its first entry is in the table (None: always)
+_REVERSE_NEGATED_COLUMNS = (
+    (None, ('x', 'py', 'zeta')),  # Dx/Ds, Dy/Ds unchanged
+    ('kin_px', ('kin_py', 'kin_yprime')),
+    ('betx', ('alfx', 'alfy', 'dx', 'dpy', 'dzeta')),
+    ('dx_zeta', ('dpx_zeta', 'dy_zeta')),
+    ('ax_chrom', ('ax_chrom', 'ay_chrom', 'ddx', 'ddpy')),
+)
+
 class TwissInit:
 
     def __init__(self, particle_on_co=None, W_matrix=None, element_name=None,
@@ -2693,12 +2748,7 @@ class TwissInit:
         out.particle_on_co.py = -out.particle_on_co.py
         out.particle_on_co.zeta = -out.particle_on_co.zeta
 
-        out.W_matrix[0, :] = -out.W_matrix[0, :]
-        out.W_matrix[1, :] = out.W_matrix[1, :]
-        out.W_matrix[2, :] = out.W_matrix[2, :]
-        out.W_matrix[3, :] = -out.W_matrix[3, :]
-        out.W_matrix[4, :] = -out.W_matrix[4, :]
-        out.W_matrix[5, :] = out.W_matrix[5, :]
+        out.W_matrix *= _W_MATRIX_REVERSE_SIGNS[:, np.newaxis]
 
         out.mux = 0
         out.muy = 0
@@ -2713,17 +2763,19 @@ class TwissInit:
     def __getattr__(self, name):
         if name in self.__dict__:
             return self.__dict__[name]
-        elif hasattr(self.__dict__['particle_on_co'], name):
-            # e.g. tw_init['x'] returns tw_init.particle_on_co.x
+        # e.g. tw_init['x'] returns tw_init.particle_on_co.x (single lookup
+        # instead of hasattr followed by getattr)
+        try:
             out = getattr(self.__dict__['particle_on_co'], name)
-            #always cpu
-            if hasattr(out, 'get'):
-                out = out.get()
-            if hasattr(out, '__iter__'):
-                out = out [0]
-            return out
-        else:
-            raise AttributeError(f'No attribute {name} found in TwissInit')
+        except AttributeError:
+            raise AttributeError(
+                f'No attribute {name} found in TwissInit') from None
+        #always cpu
+        if hasattr(out, 'get'):
+            out = out.get()
+        if hasattr(out, '__iter__'):
+            out = out [0]
+        return out
 
     def __setattr__(self, name, value):
         if name in self.__dict__:
@@ -2740,14 +2792,9 @@ class TwissInit:
         
         part_id = ctx2np(particles.particle_id).copy()
         at_element = ctx2np(particles.at_element).copy()
-        at_turn = ctx2np(particles.at_element).copy()
-        x_norm = ctx2np(particles.x).copy() 
-        px_norm = x_norm.copy()
-        y_norm = x_norm.copy()
-        py_norm = x_norm.copy()
-        zeta_norm = x_norm.copy()
-        pzeta_norm = x_norm.copy()
+        at_turn = at_element.copy()
 
+        # Each ctx2np call is a full transfer from the context, done once
         XX_norm  = _W_phys2norm(x = ctx2np(particles.x),
                                 px = ctx2np(particles.px),
                                 y = ctx2np(particles.y),
@@ -2760,21 +2807,8 @@ class TwissInit:
                                 nemitt_y = nemitt_y,
                                 nemitt_zeta = nemitt_zeta)
 
-        if XX_norm.ndim == 2:
-            x_norm = XX_norm[0, :]
-            px_norm = XX_norm[1, :]
-            y_norm = XX_norm[2, :]
-            py_norm = XX_norm[3, :]
-            zeta_norm = XX_norm[4, :]
-            pzeta_norm = XX_norm[5, :]
-        elif XX_norm.ndim == 3:
-            x_norm = XX_norm[0, :, :]
-            px_norm = XX_norm[1, :, :]
-            y_norm = XX_norm[2, :, :]
-            py_norm = XX_norm[3, :, :]
-            zeta_norm = XX_norm[4, :, :]
-            pzeta_norm = XX_norm[5, :, :]
-
+        # Coordinates along the first axis (particle arrays may be 1D or 2D)
+        x_norm, px_norm, y_norm, py_norm, zeta_norm, pzeta_norm = XX_norm
 
         return Table({'particle_id': part_id, 'at_element': at_element,'at_turn':at_turn,
                       'x_norm': x_norm, 'px_norm': px_norm, 'y_norm': y_norm,
@@ -2837,8 +2871,7 @@ class TwissTable(Table):
 
         data = self._data.copy()
         if 'W_matrix' in data.keys():
-            data['W_matrix'] = [
-                self.W_matrix[ii] for ii in range(len(self.W_matrix))]
+            data['W_matrix'] = list(self.W_matrix) # one 6x6 view per row
 
         import pandas as pd
         df = pd.DataFrame(data, columns=self._col_names)
@@ -2846,12 +2879,33 @@ class TwissTable(Table):
             df.set_index(index, inplace=True)
         return df
 
+    def _name_to_index(self, name):
+        # {name: index} map (first occurrence), kept until the name column is
+        # replaced
+        names = self._data['name']
+        cached = self.__dict__.get('_name_to_index_cache', None)
+        if cached is None or cached[0] is not names:
+            cached = (names, _build_name_to_index_map(names))
+            self.__dict__['_name_to_index_cache'] = cached
+        if name not in cached[1]:
+            raise IndexError(f'Element {name} not found in the twiss table')
+        return cached[1][name]
+
+    def _W_matrix_inv(self):
+        # Inverse of all W matrices, kept until the W_matrix column is replaced
+        W_matrix = self._data['W_matrix']
+        cached = self.__dict__.get('_W_matrix_inv_cache', None)
+        if cached is None or cached[0] is not W_matrix:
+            cached = (W_matrix, np.linalg.inv(W_matrix))
+            self.__dict__['_W_matrix_inv_cache'] = cached
+        return cached[1]
+
     def get_twiss_init(self, at_element):
 
         assert self.values_at == 'entry', 'Not yet implemented for exit'
 
         if isinstance(at_element, str):
-            at_element = np.where(self.name == at_element)[0][0]
+            at_element = self._name_to_index(at_element)
         part = self.particle_on_co.copy()
         part.x[:] = self.x[at_element]
         part.px[:] = self.px[at_element]
@@ -2937,21 +2991,17 @@ class TwissTable(Table):
         if self.method == '4d':
             Ws[:, 4:, 4:] = 0
 
-        v1 = Ws[:,:,0] + 1j * Ws[:,:,1]
-        v2 = Ws[:,:,2] + 1j * Ws[:,:,3]
-        v3 = Ws[:,:,4] + 1j * Ws[:,:,5]
-
-        Sigma1 = np.zeros(shape=(len(self.s), 6, 6), dtype=np.float64)
-        Sigma2 = np.zeros(shape=(len(self.s), 6, 6), dtype=np.float64)
-        Sigma3 = np.zeros(shape=(len(self.s), 6, 6), dtype=np.float64)
-
-        for ii in range(6):
-            for jj in range(6):
-                Sigma1[:, ii, jj] = np.real(v1[:,ii] * v1[:,jj].conj())
-                Sigma2[:, ii, jj] = np.real(v2[:,ii] * v2[:,jj].conj())
-                Sigma3[:, ii, jj] = np.real(v3[:,ii] * v3[:,jj].conj())
+        # Re(v_i v_j^*) = Re(v_i) Re(v_j) + Im(v_i) Im(v_j) for each mode
+        # v_k = W[:, :, 2k] + 1j * W[:, :, 2k+1], so scaling the columns by
+        # the square root of the emittances gives Sigma as W W^T
+        Ws[:, :, 0:2] *= np.sqrt(gemitt_x)
+        Ws[:, :, 2:4] *= np.sqrt(gemitt_y)
+        if np.all(gemitt_zeta == 0):
+            Ws = Ws[:, :, :4] # no contribution from the longitudinal mode
+        else:
+            Ws[:, :, 4:6] *= np.sqrt(gemitt_zeta)
 
-        Sigma = gemitt_x * Sigma1 + gemitt_y * Sigma2 + gemitt_zeta * Sigma3
+        Sigma = Ws @ Ws.transpose(0, 2, 1)
         res = _build_sigma_table(Sigma=Sigma, s=self.s, name=self.name)
 
         return Table(res)
@@ -3031,9 +3081,9 @@ class TwissTable(Table):
         assert self.values_at == 'entry', 'Not yet implemented for exit'
 
         if isinstance(start, str):
-            start = np.where(self.name == start)[0][0]
+            start = self._name_to_index(start)
         if isinstance(end, str):
-            end = np.where(self.name == end)[0][0]
+            end = self._name_to_index(end)
 
         if start > end:
             raise ValueError('start must be smaller than ele_end')
@@ -3072,52 +3122,54 @@ class TwissTable(Table):
 
         part_id = ctx2np(particles.particle_id).copy()
         at_element = part_id.copy() * 0 + xt.particles.LAST_INVALID_STATE
-        x_norm = ctx2np(particles.x).copy() * 0 + xt.particles.LAST_INVALID_STATE
-        px_norm = x_norm.copy()
-        y_norm = x_norm.copy()
-        py_norm = x_norm.copy()
-        zeta_norm = x_norm.copy()
-        pzeta_norm = x_norm.copy()
+        # Rows are x, px, y, py, zeta, pzeta (normalized)
+        XX_norm_all = np.full((6, len(part_id)), xt.particles.LAST_INVALID_STATE,
+                              dtype=np.float64)
 
-        at_element_no_rep = list(set(
-            at_element_particles[part_id > xt.particles.LAST_INVALID_STATE]))
+        at_element_no_rep = np.unique(
+            at_element_particles[part_id > xt.particles.LAST_INVALID_STATE])
 
-        for at_ele in at_element_no_rep:
+        if len(at_element_no_rep) > 0:
 
             if _force_at_element is not None:
-                at_ele = _force_at_element
+                i_part = np.flatnonzero(
+                    ctx2np(particles.state) > xt.particles.LAST_INVALID_STATE)
+                at_ele = np.full(len(i_part), _force_at_element)
+            else:
+                i_part = np.flatnonzero(
+                    np.isin(at_element_particles, at_element_no_rep))
+                at_ele = at_element_particles[i_part]
 
-            W = self.W_matrix[at_ele]
+            # Inverse W matrices of the distinct elements, gathered per particle
+            ele_unique, i_unique = np.unique(at_ele, return_inverse=True)
+            W_inv = self._W_matrix_inv()[ele_unique][i_unique]
 
-            mask_at_ele = at_element_particles == at_ele
+            beta0 = self.particle_on_co._xobject.beta0[0]
+            gamma0 = self.particle_on_co._xobject.gamma0[0]
 
-            if _force_at_element is not None:
-                mask_at_ele = ctx2np(particles.state) > xt.particles.LAST_INVALID_STATE
-
-
-            XX_norm  = _W_phys2norm(x = ctx2np(particles.x)[mask_at_ele],
-                                    px = ctx2np(particles.px)[mask_at_ele],
-                                    y = ctx2np(particles.y)[mask_at_ele],
-                                    py = ctx2np(particles.py)[mask_at_ele],
-                                    zeta = ctx2np(particles.zeta)[mask_at_ele],
-                                    pzeta = ctx2np(particles.ptau)[mask_at_ele]/ctx2np(particles.beta0)[mask_at_ele],
-                                    W_matrix = W,
-                                    co_dict = {'x': self.x[at_ele], 'px': self.px[at_ele],
-                                               'y': self.y[at_ele], 'py': self.py[at_ele],
-                                               'zeta': self.zeta[at_ele], 'ptau': self.ptau[at_ele],
-                                               'beta0': self.particle_on_co._xobject.beta0[0],
-                                               'gamma0': self.particle_on_co._xobject.gamma0[0]},
-                                    nemitt_x = nemitt_x,
-                                    nemitt_y = nemitt_y,
-                                    nemitt_zeta = nemitt_zeta)
-
-            x_norm[mask_at_ele] = XX_norm[0, :]
-            px_norm[mask_at_ele] = XX_norm[1, :]
-            y_norm[mask_at_ele] = XX_norm[2, :]
-            py_norm[mask_at_ele] = XX_norm[3, :]
-            zeta_norm[mask_at_ele] = XX_norm[4, :]
-            pzeta_norm[mask_at_ele] = XX_norm[5, :]
-            at_element[mask_at_ele] = at_ele
+            XX = np.array([
+                ctx2np(particles.x)[i_part] - self.x[at_ele],
+                ctx2np(particles.px)[i_part] - self.px[at_ele],
+                ctx2np(particles.y)[i_part] - self.y[at_ele],
+                ctx2np(particles.py)[i_part] - self.py[at_ele],
+                ctx2np(particles.zeta)[i_part] - self.zeta[at_ele],
+                (ctx2np(particles.ptau)[i_part]
+                    / ctx2np(particles.beta0)[i_part]
+                    - self.ptau[at_ele] / beta0)])
+
+            XX_norm = np.einsum('pij,jp->ip', W_inv, XX)
+
+            gemitt_x = 1. if nemitt_x is None else nemitt_x / beta0 / gamma0
+            gemitt_y = 1. if nemitt_y is None else nemitt_y / beta0 / gamma0
+            gemitt_zeta = (1. if nemitt_zeta is None
+                           else nemitt_zeta / beta0 / gamma0)
+            XX_norm /= np.sqrt([gemitt_x, gemitt_x, gemitt_y, gemitt_y,
+                                gemitt_zeta, gemitt_zeta])[:, np.newaxis]
+
+            XX_norm_all[:, i_part] = XX_norm
+            at_element[i_part] = at_ele
+
+        x_norm, px_norm, y_norm, py_norm, zeta_norm, pzeta_norm = XX_norm_all
 
         return Table({'particle_id': part_id, 'at_element': at_element,
                       'x_norm': x_norm, 'px_norm': px_norm, 'y_norm': y_norm,
@@ -3129,8 +3181,11 @@ class TwissTable(Table):
         assert self.values_at == 'entry', 'Not yet implemented for exit'
         assert self.name[-1] == '_end_point' # Needed for the present implementation
 
+        # Columns are built reversed below, only the other entries are copied
         new_data = {}
         for kk, vv in self._data.items():
+            if kk in self._col_names:
+                continue
             if hasattr(vv, 'copy'):
                 new_data[kk] = vv.copy()
             else:
@@ -3143,19 +3198,17 @@ class TwissTable(Table):
             itake = slice(1, None, None)
 
         for kk in self._col_names:
-            if (kk == 'name' or kk in NORMAL_STRENGTHS_FROM_ATTR
-                    or kk in SKEW_STRENGTHS_FROM_ATTR
-                    or kk in OTHER_FIELDS_FROM_ATTR
-                    or kk in OTHER_FIELDS_FROM_TABLE
-                    ):
-                new_data[kk][:-1] = new_data[kk][:-1][::-1]
-                new_data[kk][-1] = self[kk][-1]
-            elif kk == 'W_matrix':
-                new_data[kk][:-1, :, :] = new_data[kk][itake, :, :][::-1, :, :]
-                new_data[kk][-1, :, :] = self[kk][0, :, :]
+            vv = self._data[kk]
+            if kk in _REVERSE_ELEMENT_COLUMNS:
+                new_data[kk] = np.concatenate((vv[:-1][::-1], vv[-1:]))
             else:
-                new_data[kk][:-1] = new_data[kk][itake][::-1]
-                new_data[kk][-1] = self[kk][0]
+                new_data[kk] = np.concatenate((vv[itake][::-1], vv[:1]))
+
+        # Columns changing sign, grouped by the column telling if they exist
+        for kk_check, kk_negate in _REVERSE_NEGATED_COLUMNS:
+            if kk_check is None or kk_check in new_data:
+                for kk in kk_negate:
+                    np.negative(new_data[kk], out=new_data[kk])
 
         out = self.__class__(data=new_data, col_names=self._col_names)
 
@@ -3164,64 +3217,21 @@ class TwissTable(Table):
 
         out.s = circumference - out.s
 
-        out.x = -out.x
-        out.px = out.px # Dx/Ds
-        out.y = out.y
-        out.py = -out.py # Dy/Ds
-        out.zeta = -out.zeta
-        out.delta = out.delta
-        out.ptau = out.ptau
-
-        if 'kin_px' in out:
-            out.kin_px = out.kin_px
-            out.kin_py = -out.kin_py
-            out.kin_xprime = out.kin_xprime
-            out.kin_yprime = -out.kin_yprime
-
         if 'betx' in out:
             # if optics calculation is not skipped
-            out.betx = out.betx
-            out.bety = out.bety
-            out.alfx = -out.alfx # Dpx/Dx
-            out.alfy = -out.alfy # Dpy/Dy
-            out.gamx = out.gamx
-            out.gamy = out.gamy
-
-            out.dx = -out.dx
-            out.dpx = out.dpx
-            out.dy = out.dy
-            out.dpy = -out.dpy
-            out.dzeta = -out.dzeta
-
-            if 'dx_zeta' in out._col_names:
-                out.dx_zeta = out.dx_zeta
-                out.dpx_zeta = -out.dpx_zeta
-                out.dy_zeta = -out.dy_zeta
-                out.dpy_zeta = out.dpy_zeta
-
             # Untested:
             # if 'alfx2' in out._col_names:
             #     out.alfx2 = -out.alfx2
             #     out.alfy2 = -out.alfy2
 
-            out.W_matrix[:, 0, :] = -out.W_matrix[:, 0, :]
-            out.W_matrix[:, 1, :] = out.W_matrix[:, 1, :]
-            out.W_matrix[:, 2, :] = out.W_matrix[:, 2, :]
-            out.W_matrix[:, 3, :] = -out.W_matrix[:, 3, :]
-            out.W_matrix[:, 4, :] = -out.W_matrix[:, 4, :]
-            out.W_matrix[:, 5, :] = out.W_matrix[:, 5, :]
+            W_matrix = out.W_matrix
+            W_matrix *= _W_MATRIX_REVERSE_SIGNS[np.newaxis, :, np.newaxis]
 
             out.mux = out.mux[0] - out.mux
             out.muy = out.muy[0] - out.muy
             out.muzeta = out.muzeta[0] - out.muzeta
             out.dzeta = out.dzeta[0] - out.dzeta
 
-        if 'ax_chrom' in out._col_names:
-            out.ax_chrom = -out.ax_chrom
-            out.ay_chrom = -out.ay_chrom
-            out.ddx = -out.ddx
-            out.ddpy = -out.ddpy
-
         if hasattr(out, 'R_matrix'): out.R_matrix = None # To be implemented
         if hasattr(out, 'particle_on_co'):
             out.particle_on_co = self.particle_on_co.copy()
@@ -3469,46 +3479,15 @@ def _complete_steps_r_matrix_with_default(steps_r_matrix):
     return steps_r_matrix
 
 def _renormalize_eigenvectors(Ws):
-    # Re normalize eigenvectors
-    v1 = Ws[:, :, 0] + 1j * Ws[:, :, 1]
-    v2 = Ws[:, :, 2] + 1j * Ws[:, :, 3]
-    v3 = Ws[:, :, 4] + 1j * Ws[:, :, 5]
-
-    S = lnf.S
-    S_v1_imag = v1 * 0.0
-    S_v2_imag = v2 * 0.0
-    S_v3_imag = v3 * 0.0
-    for ii in range(6):
-        for jj in range(6):
-            if S[ii, jj] !=0:
-                S_v1_imag[:, ii] +=  S[ii, jj] * v1.imag[:, jj]
-                S_v2_imag[:, ii] +=  S[ii, jj] * v2.imag[:, jj]
-                S_v3_imag[:, ii] +=  S[ii, jj] * v3.imag[:, jj]
-
-    nux = np.squeeze(Ws[:, 0, 0]) * (0.0 + 0j)
-    nuy = nux * 0.0
-    nuzeta = nux * 0.0
-
-    for ii in range(6):
-        nux += v1.real[:, ii] * S_v1_imag[:, ii]
-        nuy += v2.real[:, ii] * S_v2_imag[:, ii]
-        nuzeta += v3.real[:, ii] * S_v3_imag[:, ii]
+    # Re normalize eigenvectors, v_k = W[:, :, 2k] + 1j * W[:, :, 2k+1]
+    # nu_k^2 = Re(v_k)^T S Im(v_k), computed for the three modes together
+    S_Ws_imag = lnf.S @ Ws[:, :, 1::2]
+    nus = np.einsum('nik,nik->nk', Ws[:, :, 0::2], S_Ws_imag)
+    nus = np.sqrt(np.abs(nus)) # always positive
 
-    nux = np.sqrt(np.abs(nux)) # nux is always positive
-    nuy = np.sqrt(np.abs(nuy)) # nuy is always positive
-    nuzeta = np.sqrt(np.abs(nuzeta)) # nuzeta is always positive
+    Ws /= np.repeat(nus, 2, axis=1)[:, np.newaxis, :]
 
-    for ii in range(6):
-        v1[:, ii] /= nux
-        v2[:, ii] /= nuy
-        v3[:, ii] /= nuzeta
-
-    Ws[:, :, 0] = np.real(v1)
-    Ws[:, :, 1] = np.imag(v1)
-    Ws[:, :, 2] = np.real(v2)
-    Ws[:, :, 3] = np.imag(v2)
-    Ws[:, :, 4] = np.real(v3)
-    Ws[:, :, 5] = np.imag(v3)
+    nux, nuy, nuzeta = nus.T.copy()
 
     return nux, nuy, nuzeta
 
@@ -3518,27 +3497,24 @@ def _extract_twiss_parameters_with_inverse(Ws):
     # From E. Forest, "From tracking code to analysis", Sec 4.1.2 or better
     # https://iopscience.iop.org/article/10.1088/1748-0221/7/07/P07012
 
-    EE = np.zeros(shape=(3, Ws.shape[0], 6, 6), dtype=np.float64)
-
-    for ii in range(3):
-        Iii = np.zeros(shape=(6, 6))
-        Iii[2*ii, 2*ii] = 1
-        Iii[2*ii+1, 2*ii+1] = 1
-        Sii = lnf.S @ Iii
-
-        Ws_inv = np.linalg.inv(Ws)
+    # E_ii = - W S I_ii W^-1 S, where I_ii selects columns 2ii and 2ii+1.
+    # Only a few entries are needed, each being a sum of two products.
+    WS = Ws @ lnf.S
+    WinvS = np.linalg.inv(Ws) @ lnf.S
 
-        EE[ii, :, :, :] = - Ws @ Sii @ Ws_inv @ lnf.S
+    def _EE(ii, aa, bb):
+        kk = slice(2*ii, 2*ii + 2)
+        return -np.einsum('nk,nk->n', WS[:, aa, kk], WinvS[:, kk, bb])
 
-    betx = EE[0, :, 0, 0]
-    bety = EE[1, :, 2, 2]
-    alfx = -EE[0, :, 0, 1]
-    alfy = -EE[1, :, 2, 3]
-    gamx = EE[0, :, 1, 1]
-    gamy = EE[1, :, 3, 3]
+    betx = _EE(0, 0, 0)
+    bety = _EE(1, 2, 2)
+    alfx = -_EE(0, 0, 1)
+    alfy = -_EE(1, 2, 3)
+    gamx = _EE(0, 1, 1)
+    gamy = _EE(1, 3, 3)
 
-    bety1 = np.abs(EE[0, :, 2, 2])
-    betx2 = np.abs(EE[1, :, 0, 0])
+    bety1 = np.abs(_EE(0, 2, 2))
+    betx2 = np.abs(_EE(1, 0, 0))
 
     sign_x = np.sign(betx)
     sign_y = np.sign(bety)
@@ -3551,13 +3527,48 @@ def _extract_twiss_parameters_with_inverse(Ws):
 
     return betx, alfx, gamx, bety, alfy, gamy, bety1, betx2
 
+def _build_name_to_index_map(element_names):
+    out = {}
+    for ii, nn in enumerate(element_names):
+        out.setdefault(nn, ii) # first occurrence, as list.index
+    return out
+
+def _name_to_index_map(line):
+    # Cached on the tracker data, which is rebuilt whenever the element
+    # sequence changes. The identity check guards against cache dicts that
+    # are copied to tracker data with different element names.
+    element_names = line.element_names
+    if not line._has_valid_tracker():
+        return _build_name_to_index_map(element_names)
+    cache = line.tracker._tracker_data_base.cache
+    cached = cache.get('name_to_index', None)
+    if cached is None or cached[0] is not element_names:
+        cached = (element_names, _build_name_to_index_map(element_names))
+        cache['name_to_index'] = cached
+    return cached[1]
+
+def _element_table_columns(line):
+    # Element types and parents only change when the tracker is rebuilt
+    if not line._has_valid_tracker():
+        table_dict = line._to_table_dict()
+        return {kk: table_dict[kk] for kk in OTHER_FIELDS_FROM_TABLE}
+    cache = line.tracker._tracker_data_base.cache
+    cached = cache.get('twiss_table_columns', None)
+    if cached is None or cached[0] is not line.element_names:
+        table_dict = line._to_table_dict()
+        cached = (line.element_names,
+                  {kk: table_dict[kk] for kk in OTHER_FIELDS_FROM_TABLE})
+        cache['twiss_table_columns'] = cached
+    return cached[1]
+
 def _str_to_index(line, ele, allow_end_point=True):
     if allow_end_point and ele == '_end_point':
         return len(line.element_names)
     if isinstance(ele, str):
-        if ele not in line.element_names:
+        idx = _name_to_index_map(line).get(ele, None)
+        if idx is None:
             raise ValueError(f'Element {ele} not found in line')
-        return line.element_names.index(ele)
+        return idx
     else:
         return ele
 